@@ -6,9 +6,20 @@ from .active_objects import (
     ActiveObject,
     ActiveObjectWithRetries,
     ActiveObjectsController,
+    ControllerMonitor,
+    EdfQueue,
+    AsyncWakeup,
     async_loop,
     simple_loop,
-    emulate_asap
+    emulate_asap,
+    WAKE_SIGNAL,
+    WAKE_TIMER,
+    WAKE_LISTENER,
+    WAKE_FLAG,
+    WAKE_DB,
+    WAKE_ASYNC,
+    register_wake_reason,
+    wake_reason_names
 )
 
 from .signals import (
@@ -25,9 +36,47 @@ from .async_tasks import (
     AbstractTask,
     AsyncTaskProcess,
     SystemTaskProcess,
+    TaskPool,
+    ExecutorTask,
+    ThreadPoolTask,
+    ProcessPoolTask,
+    get_thread_executor,
+    get_process_executor,
+    shutdown_executors,
+    get_timeout_stats,
     test_process
 )
 
+from .simulation import Simulation
+
+from .scenarios import ScenarioResult, run_scenario, run_scenarios
+
+from .sharding import Shard, ShardedController, shard_of
+
+from .threaded import ThreadedController, gil_enabled
+
+from .offload import OffloadedObject, BlockingPool, get_blocking_pool
+
+from .spawn_pool import SpawnPool, PooledProcess
+
+from .output_capture import OutputCapture, OutputBuffer, WAKE_OUTPUT
+
+from .task_dag_executor import TaskDag, DagTaskNode
+
+from .task_cache import TaskCache, task_fingerprint
+
+from .async_objects import AsyncActiveObject, AsyncSlots, get_async_slots
+
+from .storm_detector import StormDetector
+
+from .metrics import LogHistogram, ControllerMetrics
+
+from .tracing import ControllerTracer
+
+from .profiling import CausalityProfiler, SamplingProfiler
+
+from .watchdog import ProcessWatchdog
+
 from .db_active_objects import (
     DbObject,
     get_db_state,
@@ -38,9 +87,20 @@ __all__ = [
     'ActiveObject',
     'ActiveObjectWithRetries',
     'ActiveObjectsController',
+    'ControllerMonitor',
+    'EdfQueue',
+    'AsyncWakeup',
     'async_loop',
     'simple_loop',
     'emulate_asap',
+    'WAKE_SIGNAL',
+    'WAKE_TIMER',
+    'WAKE_LISTENER',
+    'WAKE_FLAG',
+    'WAKE_DB',
+    'WAKE_ASYNC',
+    'register_wake_reason',
+    'wake_reason_names',
     'Signaler',
     'Listener',
     'AOListener',
@@ -51,7 +111,46 @@ __all__ = [
     'AbstractTask',
     'AsyncTaskProcess',
     'SystemTaskProcess',
+    'TaskPool',
+    'ExecutorTask',
+    'ThreadPoolTask',
+    'ProcessPoolTask',
+    'get_thread_executor',
+    'get_process_executor',
+    'shutdown_executors',
+    'get_timeout_stats',
     'test_process',
+    'TaskDag',
+    'DagTaskNode',
+    'TaskCache',
+    'task_fingerprint',
+    'SpawnPool',
+    'PooledProcess',
+    'OutputCapture',
+    'OutputBuffer',
+    'WAKE_OUTPUT',
+    'AsyncActiveObject',
+    'AsyncSlots',
+    'get_async_slots',
+    'Simulation',
+    'ScenarioResult',
+    'run_scenario',
+    'run_scenarios',
+    'Shard',
+    'ShardedController',
+    'shard_of',
+    'ThreadedController',
+    'gil_enabled',
+    'OffloadedObject',
+    'BlockingPool',
+    'get_blocking_pool',
+    'StormDetector',
+    'LogHistogram',
+    'ControllerMetrics',
+    'ControllerTracer',
+    'CausalityProfiler',
+    'SamplingProfiler',
+    'ProcessWatchdog',
     'DbObject',
     'get_db_state',
     'poll_db_changes'
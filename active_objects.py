@@ -1,24 +1,236 @@
 """Основные классы активных объектов и контроллера"""
 from datetime import datetime, timedelta
-from typing import Optional, List, Callable, Any, Union
+from typing import Optional, List, Callable, Any, Union, Iterable, Dict
 import asyncio
+import threading
 import time
 
 from .data_structures.avl_tree import TreeNode, Tree
 from .data_structures.linked_list import DualLinkedListItem, DualLinkedList
 
+# Причины пробуждения объекта (битовая маска)
+WAKE_SIGNAL = 1      # явный вызов signal()
+WAKE_TIMER = 2       # наступило запланированное время
+WAKE_LISTENER = 4    # сигнал от Signaler/Listener
+WAKE_FLAG = 8        # изменение состояния Flag
+WAKE_DB = 16         # изменение состояния в БД
+WAKE_ASYNC = 32      # завершение асинхронной задачи
+
+_wake_reason_names = {
+    WAKE_SIGNAL: 'signal',
+    WAKE_TIMER: 'timer',
+    WAKE_LISTENER: 'listener',
+    WAKE_FLAG: 'flag',
+    WAKE_DB: 'db',
+    WAKE_ASYNC: 'async',
+}
+
+
+def register_wake_reason(name: str) -> int:
+    """Зарегистрировать именованную причину пробуждения, вернуть ее бит"""
+    for bit, n in _wake_reason_names.items():
+        if n == name:
+            return bit
+    bit = max(_wake_reason_names) << 1
+    _wake_reason_names[bit] = name
+    return bit
+
+
+def wake_reason_names(reasons: int) -> List[str]:
+    """Получить имена причин пробуждения из битовой маски"""
+    return [n for bit, n in _wake_reason_names.items() if reasons & bit]
+
+
+class _OffloadState(threading.local):
+    offloaded: bool = False  # поток пула выполняет _process OffloadedObject
+
+
+_offload_state = _OffloadState()
+_OFFLOADED_ACCESS = ('Controller accessed from an offloaded _process, '
+                     'use controller.threadsafe_async_call')
+
+
+class EdfQueue:
+    """
+    Очередь сигнализированных объектов в порядке ближайшего дедлайна (EDF).
+    Совместима с DualLinkedList в части, используемой контроллером.
+    Объекты без дедлайна обрабатываются после объектов с дедлайном (FIFO).
+    """
+
+    def __init__(self, controller: 'ActiveObjectsController'):
+        self.controller = controller
+        self.tree = Tree(_comp_deadline)
+        self.processed: int = 0  # извлечено объектов с дедлайном
+        self.missed: int = 0  # из них с пропущенным дедлайном
+        self.max_lateness: timedelta = timedelta(0)
+
+    @property
+    def count(self) -> int:
+        """Количество объектов в очереди"""
+        return self.tree.count
+
+    @property
+    def first(self) -> Optional[DualLinkedListItem]:
+        """Элемент с ближайшим дедлайном"""
+        node = self.tree.get_leftmost()
+        return node.owner.signaled if node else None
+
+    def add(self, item: DualLinkedListItem):
+        """Добавить (или переупорядочить) элемент"""
+        if item.list is not None:
+            item.list.remove(item)
+        obj = item.owner
+        if obj.deadline is None and obj.deadline_delay is not None:
+            obj.deadline = self.controller.now() + obj.deadline_delay
+        self.tree.add(obj.tree_by_deadline)
+        item.list = self
+
+    def remove(self, item: DualLinkedListItem):
+        """Удалить элемент"""
+        if item.list is not self:
+            return
+        self.tree.remove(item.owner.tree_by_deadline)
+        item.list = None
+
+    def remove_first(self) -> Optional[DualLinkedListItem]:
+        """Извлечь элемент с ближайшим дедлайном"""
+        node = self.tree.get_leftmost()
+        if node is None:
+            return None
+        self.tree.remove(node)
+        obj = node.owner
+        obj.signaled.list = None
+        if obj.deadline is not None:
+            self.processed += 1
+            lateness = self.controller.now() - obj.deadline
+            if lateness > timedelta(0):
+                self.missed += 1
+                if lateness > self.max_lateness:
+                    self.max_lateness = lateness
+            obj.deadline = None
+        return obj.signaled
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика дедлайнов"""
+        return {
+            'queued': self.tree.count,
+            'processed': self.processed,
+            'missed': self.missed,
+            'max_lateness': self.max_lateness.total_seconds()
+        }
+
+
+class ControllerMonitor:
+    """
+    Наблюдатель за работой контроллера (метрики, трассировка, диагностика).
+    Подключается через ActiveObjectsController.add_monitor(). Пока
+    наблюдателей нет, контроллер не тратит на них время. before_process
+    вызывается в порядке подключения, after_process и skip_process - в
+    обратном; наблюдатели с innermost всегда ближе всех к _process.
+    Длительность самого _process - controller.process_time.
+    """
+
+    controller: Optional['ActiveObjectsController'] = None
+    innermost: bool = False  # before_process последним, after_process первым
+    needs_signal_time: bool = False  # требуется ActiveObject.signaled_at
+    needs_signal_hook: bool = False  # вызывать on_signal
+
+    def attach(self, controller: 'ActiveObjectsController'):
+        """Подключение к контроллеру"""
+        self.controller = controller
+
+    def detach(self, controller: 'ActiveObjectsController'):
+        """Отключение от контроллера"""
+        self.controller = None
+
+    def before_process(self, obj: 'ActiveObject') -> bool:
+        """Перед вызовом _process. True - пропустить обработку объекта"""
+        return False
+
+    def after_process(self, obj: 'ActiveObject', error: Optional[Exception]):
+        """После вызова _process (не вызывается, если обработка пропущена)"""
+        pass
+
+    def skip_process(self, obj: 'ActiveObject'):
+        """
+        Обработка объекта пропущена другим наблюдателем, подключенным позже
+        (вызывается вместо after_process, если before_process уже был вызван)
+        """
+        pass
+
+    def on_timer(self, obj: 'ActiveObject', t: datetime):
+        """Наступило запланированное время t объекта"""
+        pass
+
+    def on_async_calls(self, count: int, duration: float):
+        """Выполнены вызовы из threadsafe_async_call"""
+        pass
+
+    def on_task_completed(self, task: 'ActiveObject', duration: float):
+        """Завершилась асинхронная задача (см. async_tasks)"""
+        pass
+
+    def on_signal(self, source: Optional['ActiveObject'], target: 'ActiveObject',
+                  reason: int):
+        """
+        Объект target поставлен в очередь сигналом из _process объекта source
+        (None - вне _process). Вызывается при needs_signal_hook.
+        """
+        pass
+
 
 class ActiveObjectsController:
     """Контроллер активных объектов"""
 
-    def __init__(self, priority_count: int = 1):
+    def __init__(self, priority_count: int = 1,
+                 edf_priorities: Optional[Iterable[int]] = None,
+                 aging: Optional[timedelta] = None):
         self.tree_by_t = Tree(_comp_t)
         self.tree_by_id = Tree(_comp_id)
-        self.signaled = [DualLinkedList() for _ in range(priority_count)]
+        edf_priorities = set(edf_priorities or ())
+        self.signaled = [
+            EdfQueue(self) if p in edf_priorities else DualLinkedList()
+            for p in range(priority_count)
+        ]
+        self.aging = aging  # порог ожидания для повышения приоритета
+        self.stamp_signals: bool = aging is not None  # запоминать время сигнала
+        self.aged_count: int = 0  # количество повышений приоритета
         self.terminated: bool = False
         self.emulated_time: Optional[datetime] = None
         self.async_tasks: List[tuple] = []
-        self.wakeup_event: Optional[asyncio.Event] = None
+        self.wakeup_event: Optional['AsyncWakeup'] = None
+        self.signal_lock: Optional[threading.RLock] = None  # доставка сигналов под блокировкой (ThreadedController)
+        self.monitors: List[ControllerMonitor] = []
+        self.signal_monitors: List[ControllerMonitor] = []
+        self.current: Optional['ActiveObject'] = None  # обрабатываемый объект (при наблюдении)
+        self.process_start: float = 0.0  # perf_counter начала текущего _process (при наблюдении)
+        self.process_time: float = 0.0  # длительность последнего _process (при наблюдении)
+
+    def add_monitor(self, monitor: ControllerMonitor) -> ControllerMonitor:
+        """Подключить наблюдателя"""
+        if monitor not in self.monitors:
+            monitor.attach(self)
+            self.monitors = sorted(self.monitors + [monitor], key=lambda m: m.innermost)
+            self._update_stamp_signals()
+        return monitor
+
+    def remove_monitor(self, monitor: ControllerMonitor):
+        """Отключить наблюдателя"""
+        if monitor in self.monitors:
+            self.monitors = [m for m in self.monitors if m is not monitor]
+            monitor.detach(self)
+            self._update_stamp_signals()
+
+    def set_aging(self, aging: Optional[timedelta]):
+        """Изменить порог ожидания для повышения приоритета"""
+        self.aging = aging
+        self._update_stamp_signals()
+
+    def _update_stamp_signals(self):
+        self.signal_monitors = [m for m in self.monitors if m.needs_signal_hook]
+        self.stamp_signals = (self.aging is not None or
+                              len(self.signal_monitors) > 0 or
+                              any(m.needs_signal_time for m in self.monitors))
 
     def find(self, type_id, obj_id) -> Optional['ActiveObject']:
         """Найти объект по типу и ID"""
@@ -46,18 +258,47 @@ class ActiveObjectsController:
                 on_success: Callable = None,
                 on_error: Callable = None) -> Optional[datetime]:
         """Обработать очередную порцию объектов"""
+        monitors = self.monitors
+
+        def do_monitored(obj: 'ActiveObject'):
+            for i, m in enumerate(monitors):
+                if m.before_process(obj):
+                    for prev in reversed(monitors[:i]):
+                        prev.skip_process(obj)
+                    return
+            self.current = obj
+            error = None
+            self.process_start = time.perf_counter()
+            try:
+                obj._run_process()
+            except Exception as e:
+                error = e
+            finally:
+                self.process_time = time.perf_counter() - self.process_start
+                self.current = None
+                for m in reversed(monitors):
+                    m.after_process(obj, error)
+            if error is None:
+                if on_success:
+                    on_success(obj)
+            elif on_error is None:
+                raise error
+            else:
+                on_error(obj, error)
 
         def do(obj: 'ActiveObject'):
             obj.unschedule()
             if on_before and on_before(obj):
                 return
-            if on_error is None:
-                obj._process_internal()
+            if monitors:
+                do_monitored(obj)
+            elif on_error is None:
+                obj._run_process()
                 if on_success:
                     on_success(obj)
             else:
                 try:
-                    obj._process_internal()
+                    obj._run_process()
                     if on_success:
                         on_success(obj)
                 except Exception as e:
@@ -72,27 +313,15 @@ class ActiveObjectsController:
 
         while not self.terminated:
             # Обработать асинхронные задачи
-            while self.async_tasks:
-                try:
-                    func, params = self.async_tasks.pop()
-                    func(*params)
-                except Exception as e:
-                    print(f"Async task error: {e}")
+            if self.async_tasks:
+                self._run_async_calls(monitors)
 
             # Обработать запланированные по времени задачи
-            obj = self.get_nearest()
-            next_time = None
-            while obj:
-                if obj.get_t() > self.now():
-                    next_time = obj.get_t()
-                    break
-                t = obj.tree_by_t.get_successor()
-                next_task = t.owner if t else None
-                obj.unschedule()
-                obj.signal()
-                obj = next_task
+            next_time = self._fire_timers(monitors)
 
             # Обработать сигнализированные задачи
+            if self.aging is not None:
+                self.promote_aged()
             item = remove_next_signaled()
             if not item:
                 return next_time
@@ -111,6 +340,64 @@ class ActiveObjectsController:
                     break
                 item = remove_next_signaled()
 
+    def _run_async_calls(self, monitors: List[ControllerMonitor]):
+        """Выполнить вызовы, накопленные threadsafe_async_call"""
+        start = time.perf_counter() if monitors else 0
+        count = 0
+        while self.async_tasks:
+            count += 1
+            try:
+                func, params = self.async_tasks.pop()
+                func(*params)
+            except Exception as e:
+                print(f"Async task error: {e}")
+        if monitors:
+            duration = time.perf_counter() - start
+            for m in monitors:
+                m.on_async_calls(count, duration)
+
+    def _fire_timers(self, monitors: List[ControllerMonitor]) -> Optional[datetime]:
+        """Сигнализировать объекты с наступившим временем, вернуть ближайшее будущее"""
+        obj = self.get_nearest()
+        now = self.now()
+        while obj:
+            if obj.t > now:
+                return obj.t
+            t = obj.tree_by_t.get_successor()
+            next_task = t.owner if t else None
+            if monitors:
+                for m in monitors:
+                    m.on_timer(obj, obj.t)
+            obj.unschedule()
+            obj.signal(WAKE_TIMER)
+            obj = next_task
+        return None
+
+    def promote_aged(self) -> int:
+        """
+        Повысить на один уровень приоритет объектов, ожидающих в очереди
+        дольше self.aging (на каждый следующий уровень - еще self.aging).
+        EDF-очереди не просматриваются.
+        """
+        now = self.now()
+        n = 0
+        for p in range(1, len(self.signaled)):
+            queue = self.signaled[p]
+            if isinstance(queue, EdfQueue):
+                continue
+            item = queue.first
+            while item is not None:
+                obj = item.owner
+                if (obj.signaled_at is None or
+                        obj.signaled_at > now - self.aging * max(1, obj.priority - p + 1)):
+                    break
+                queue.remove(item)
+                self.signaled[p - 1].add(item)
+                n += 1
+                item = queue.first
+        self.aged_count += n
+        return n
+
     def for_each_object(self, type_id, func: Callable):
         """Выполнить функцию для каждого объекта указанного типа"""
         if type_id is None:
@@ -151,9 +438,14 @@ class ActiveObjectsController:
         self.for_each_object(type_id, lambda o: res.append(o.id))
         return res
 
-    def signal(self, type_id=None):
+    def signal(self, type_id=None, reason: int = WAKE_SIGNAL):
         """Сигнализировать все объекты указанного типа"""
-        self.for_each_object(type_id, lambda o: o.signal())
+        self.for_each_object(type_id, lambda o: o.signal(reason))
+
+    def get_edf_stats(self) -> Dict[int, Dict[str, Any]]:
+        """Статистика дедлайнов по EDF-очередям (приоритет -> статистика)"""
+        return {p: q.get_stats() for p, q in enumerate(self.signaled)
+                if isinstance(q, EdfQueue)}
 
     def terminate(self):
         """Завершить работу контроллера"""
@@ -172,6 +464,7 @@ class ActiveObject:
     controller: ActiveObjectsController
     type_id = None
     priority: int = 0
+    deadline_delay: Optional[timedelta] = None  # дедлайн по умолчанию в EDF-очереди
 
     def __init__(self, controller: ActiveObjectsController, obj_id=None):
         self.t: Optional[datetime] = None
@@ -180,6 +473,11 @@ class ActiveObject:
         self.tree_by_t = TreeNode(self)
         self.tree_by_id = TreeNode(self)
         self.signaled = DualLinkedListItem(self)
+        self.tree_by_deadline = TreeNode(self)
+        self.deadline: Optional[datetime] = None  # ближайший дедлайн сигнала
+        self.signaled_at: Optional[datetime] = None  # время постановки в очередь (при stamp_signals)
+        self.wake_reasons: int = 0  # причины текущего вызова _process
+        self._pending_reasons: int = 0  # причины, накопленные до вызова
 
         if obj_id is not None and self.type_id is not None:
             controller.tree_by_id.add(self.tree_by_id)
@@ -193,6 +491,40 @@ class ActiveObject:
         """Внутренняя обработка"""
         self._process()
 
+    def _take_reasons(self):
+        """Перенести накопленные причины в wake_reasons"""
+        lock = self.controller.signal_lock
+        if lock is None:
+            self.wake_reasons = self._pending_reasons
+            self._pending_reasons = 0
+            self.deadline = None
+        else:
+            with lock:
+                self.wake_reasons = self._pending_reasons
+                self._pending_reasons = 0
+                self.deadline = None
+
+    def _keep_reasons(self):
+        """Вернуть необработанные причины wake_reasons к следующему вызову"""
+        lock = self.controller.signal_lock
+        if lock is None:
+            self._pending_reasons |= self.wake_reasons
+        else:
+            with lock:
+                self._pending_reasons |= self.wake_reasons
+
+    def _run_process(self):
+        """Вызвать обработку с фиксацией причин пробуждения"""
+        self._take_reasons()
+        try:
+            self._process_internal()
+        finally:
+            self.wake_reasons = 0
+
+    def woken_by(self, reasons: int) -> bool:
+        """Вызван ли текущий _process по одной из указанных причин"""
+        return (self.wake_reasons & reasons) != 0
+
     def is_signaled(self) -> bool:
         """Проверить, сигнализирован ли объект"""
         return self.signaled.in_list()
@@ -203,6 +535,7 @@ class ActiveObject:
 
     def schedule(self, t: Optional[datetime]):
         """Запланировать выполнение на указанное время"""
+        assert not _offload_state.offloaded, _OFFLOADED_ACCESS
         if t is not None:
             if not self.tree_by_t.in_tree() or t < self.t:
                 self.controller.tree_by_t.remove(self.tree_by_t)
@@ -229,6 +562,7 @@ class ActiveObject:
 
     def unschedule(self):
         """Отменить запланированное выполнение"""
+        assert not _offload_state.offloaded, _OFFLOADED_ACCESS
         self.controller.tree_by_t.remove(self.tree_by_t)
         self.t = None
 
@@ -237,16 +571,63 @@ class ActiveObject:
         self.controller.tree_by_t.remove(self.tree_by_t)
         self.t = None
         self.signaled.remove()
-
-    def signal(self):
-        """Сигнализировать объект"""
+        self._pending_reasons = 0
+        self.deadline = None
+
+    def signal(self, reason: int = WAKE_SIGNAL,
+               deadline: Optional[datetime] = None):
+        """Сигнализировать объект (дедлайн учитывается EDF-очередью)"""
+        assert not _offload_state.offloaded, _OFFLOADED_ACCESS
+        lock = self.controller.signal_lock
+        if lock is None:
+            self._deliver_signal(reason, deadline)
+        else:
+            with lock:
+                self._deliver_signal(reason, deadline)
+
+    def _deliver_signal(self, reason: int, deadline: Optional[datetime]):
+        self._pending_reasons |= reason
+        if deadline is not None and (self.deadline is None or deadline < self.deadline):
+            self.deadline = deadline
+            if self.tree_by_deadline.in_tree():
+                self.signaled.list.add(self.signaled)
+                return
         if not self.signaled.in_list():
-            self.controller.signaled[self.priority].add(self.signaled)
-
-    def resignal(self):
-        """Пересигнализировать объект (переместить в конец очереди)"""
-        self.signaled.remove()
-        self.controller.signaled[len(self.controller.signaled) - 1].add(self.signaled)
+            controller = self.controller
+            if controller.stamp_signals:
+                self.signaled_at = controller.now()
+                for m in controller.signal_monitors:
+                    m.on_signal(controller.current, self, reason)
+            controller.signaled[self.priority].add(self.signaled)
+
+    def resignal(self, reason: int = WAKE_SIGNAL, priority: Optional[int] = None):
+        """
+        Пересигнализировать объект (переместить в конец очереди приоритета
+        priority, по умолчанию - последней)
+        """
+        assert not _offload_state.offloaded, _OFFLOADED_ACCESS
+        lock = self.controller.signal_lock
+        if lock is None:
+            self._deliver_resignal(reason, priority)
+        else:
+            with lock:
+                self._deliver_resignal(reason, priority)
+
+    def _deliver_resignal(self, reason: int, priority: Optional[int]):
+        self._pending_reasons |= reason
+        if priority is None:
+            priority = len(self.controller.signaled) - 1
+        if self.controller.stamp_signals:
+            self.signaled_at = self.controller.now()
+        self.controller.signaled[priority].add(self.signaled)
+
+    def set_priority(self, priority: int):
+        """Изменить приоритет объекта, в т.ч. уже стоящего в очереди"""
+        if priority == self.priority:
+            return
+        self.priority = priority
+        if self.signaled.in_list():
+            self.controller.signaled[priority].add(self.signaled)
 
     def reached(self, t: Optional[datetime]) -> bool:
         """Проверить, достигнуто ли указанное время"""
@@ -270,6 +651,8 @@ class ActiveObject:
         self.controller.tree_by_t.remove(self.tree_by_t)
         self.controller.tree_by_id.remove(self.tree_by_id)
         self.signaled.remove()
+        self._pending_reasons = 0
+        self.deadline = None
 
 
 class ActiveObjectWithRetries(ActiveObject):
@@ -292,7 +675,11 @@ class ActiveObjectWithRetries(ActiveObject):
             if self.__next_retry is None or self.reached(self.__next_retry):
                 super()._process_internal()
                 self.__next_retry = None
+            else:
+                # причины не обработаны - сохранить их до повтора
+                self._keep_reasons()
         except Exception:
+            self._keep_reasons()
             if self.__next_retry is None:
                 self.__next_retry_interval = self.min_retry_interval
             else:
@@ -333,6 +720,19 @@ def _comp_id(n1, n2):
     return _compkey_id((n1.owner.type_id, n1.owner.id), n2)
 
 
+def _comp_deadline(n1, n2):
+    d1 = n1.owner.deadline
+    d2 = n2.owner.deadline
+    if d1 is None:
+        return 0 if d2 is None else 1
+    if d2 is None or d1 < d2:
+        return -1
+    elif d1 == d2:
+        return 0
+    else:
+        return 1
+
+
 def _comp_t(n1, n2):
     if n1.owner.t > n2.owner.t:
         return 1
@@ -343,31 +743,106 @@ def _comp_t(n1, n2):
 
 
 # Функции циклов выполнения
+class AsyncWakeup:
+    """
+    Пробуждение асинхронного цикла: ожидание одного future с таймером
+    loop.call_at, который переиспользуется, пока не изменится время
+    ближайшего объекта. set() можно вызывать из любого потока.
+    """
+
+    def __init__(self, controller: ActiveObjectsController,
+                 loop: asyncio.AbstractEventLoop):
+        self.controller = controller
+        self.loop = loop
+        self.thread_id = threading.get_ident()
+        self.pending: bool = False  # было пробуждение после clear()
+        self.future: Optional[asyncio.Future] = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.timer_at: Optional[datetime] = None  # время, на которое взведен таймер
+        self.wakeups: int = 0  # пробуждений через set()
+        self.timeouts: int = 0  # пробуждений по таймеру
+
+    def set(self):
+        """Разбудить цикл"""
+        if threading.get_ident() == self.thread_id:
+            self._set()
+        else:
+            self.loop.call_soon_threadsafe(self._set)
+
+    def _set(self):
+        self.pending = True
+        fut = self.future
+        if fut is not None and not fut.done():
+            self.wakeups += 1
+            fut.set_result(None)
+
+    def is_set(self) -> bool:
+        """Было ли пробуждение после clear()"""
+        return self.pending
+
+    def clear(self):
+        """Сбросить пробуждение"""
+        self.pending = False
+
+    def _on_timer(self):
+        self.timer = None
+        self.timer_at = None
+        fut = self.future
+        if fut is not None and not fut.done():
+            self.timeouts += 1
+            fut.set_result(None)
+
+    def _set_timer(self, t: Optional[datetime]):
+        if t == self.timer_at:
+            return
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.timer_at = t
+        if t is not None:
+            delta = (t - self.controller.now()).total_seconds()
+            self.timer = self.loop.call_at(self.loop.time() + delta, self._on_timer)
+
+    async def wait(self, t: Optional[datetime] = None):
+        """Ждать пробуждения или наступления времени t"""
+        if self.pending:
+            return
+        self._set_timer(t)
+        fut = self.loop.create_future()
+        self.future = fut
+        try:
+            await fut
+        finally:
+            self.future = None
+
+    def close(self):
+        """Отменить таймер"""
+        self._set_timer(None)
+
+
 async def async_loop(controller: ActiveObjectsController):
     """Асинхронный цикл выполнения"""
     controller.terminated = False
     controller.emulated_time = None
-    controller.wakeup_event = asyncio.Event()
-    controller.wakeup = lambda: controller.wakeup_event.set()
-
-    while not controller.terminated:
-        next_time = controller.process()
-        if controller.terminated:
-            return
-        if not controller.wakeup_event.is_set():
-            if next_time:
-                delta = (next_time - controller.now()).total_seconds()
-                if delta > 0:
-                    try:
-                        await asyncio.wait_for(
-                            controller.wakeup_event.wait(),
-                            timeout=delta
-                        )
-                    except asyncio.TimeoutError:
-                        pass
-            else:
-                await controller.wakeup_event.wait()
-        controller.wakeup_event.clear()
+    loop = asyncio.get_running_loop()
+    wakeup = AsyncWakeup(controller, loop)
+    controller.wakeup_event = wakeup
+
+    try:
+        while not controller.terminated:
+            next_time = controller.process()
+            if controller.terminated:
+                return
+            if not wakeup.is_set():
+                if next_time:
+                    delta = (next_time - controller.now()).total_seconds()
+                    if delta > 0:
+                        await wakeup.wait(next_time)
+                else:
+                    await wakeup.wait()
+            wakeup.clear()
+    finally:
+        wakeup.close()
 
 
 def simple_loop(controller: ActiveObjectsController):
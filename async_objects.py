@@ -0,0 +1,184 @@
+"""Активные объекты с асинхронным (async def) _process"""
+import inspect
+from typing import Optional, Dict, Any, Coroutine
+
+from .active_objects import ActiveObject, ActiveObjectsController, WAKE_SIGNAL, WAKE_ASYNC
+from .data_structures.linked_list import DualLinkedList, DualLinkedListItem
+
+
+class AsyncSlots:
+    """Ограничение числа одновременно выполняемых _process одного типа"""
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.running: int = 0
+        self.waiting = DualLinkedList()  # объекты, ожидающие свободного места
+        self.max_waiting: int = 0
+
+    def acquire(self, obj: 'AsyncActiveObject') -> bool:
+        """Занять место или встать в очередь ожидания"""
+        if obj._slot_granted:
+            obj._slot_granted = False
+            return True
+        if obj.slot_wait.in_list():
+            return False
+        if self.limit is None or self.running < self.limit:
+            self.running += 1
+            return True
+        self.waiting.add(obj.slot_wait)
+        if self.waiting.count > self.max_waiting:
+            self.max_waiting = self.waiting.count
+        return False
+
+    def release(self):
+        """Освободить место (передается первому ожидающему)"""
+        item = self.waiting.remove_first()
+        if item is None:
+            self.running -= 1
+            return
+        obj: AsyncActiveObject = item.owner
+        obj._slot_granted = True
+        obj.signal(WAKE_ASYNC)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика ограничителя"""
+        return {
+            'limit': self.limit,
+            'running': self.running,
+            'waiting': self.waiting.count,
+            'max_waiting': self.max_waiting
+        }
+
+
+def get_async_slots(controller: ActiveObjectsController) -> Dict[Any, AsyncSlots]:
+    """Ограничители асинхронных объектов контроллера по типам"""
+    slots = getattr(controller, 'async_slots', None)
+    if slots is None:
+        slots = {}
+        controller.async_slots = slots
+    return slots
+
+
+class AsyncActiveObject(ActiveObject):
+    """
+    Активный объект, _process которого может быть async def. Корутина
+    выполняется самим контроллером без создания asyncio.Task: при ожидании
+    future объект засыпает, а по готовности future сигнализируется
+    (WAKE_ASYNC) и продолжает выполнение в очередном process(). Сигналы,
+    пришедшие во время выполнения корутины, откладываются и приводят к
+    повторному вызову _process после ее завершения. max_concurrency
+    ограничивает число одновременно выполняемых корутин типа.
+    Требует работающего цикла asyncio (async_loop); средства, требующие
+    текущей задачи (asyncio.timeout, TaskGroup), недоступны.
+    """
+
+    max_concurrency: Optional[int] = None
+
+    def __init__(self, controller: ActiveObjectsController, obj_id=None):
+        self.slot_wait = DualLinkedListItem(self)
+        self._coro: Optional[Coroutine] = None
+        self._waiting_for = None  # ожидаемый future
+        self._run_reasons: int = 0  # причины вызова, запустившего корутину
+        self._deferred_reasons: int = 0  # сигналы во время выполнения корутины
+        self._slot_granted: bool = False
+        super().__init__(controller, obj_id)
+
+    def _slots(self) -> AsyncSlots:
+        slots = get_async_slots(self.controller)
+        key = self.type_id if self.type_id is not None else self.__class__
+        s = slots.get(key)
+        if s is None:
+            s = AsyncSlots(self.max_concurrency)
+            slots[key] = s
+        return s
+
+    def is_running(self) -> bool:
+        """Выполняется ли корутина _process"""
+        return self._coro is not None
+
+    def signal(self, reason: int = WAKE_SIGNAL, deadline=None):
+        """Сигнализировать объект (во время выполнения корутины - отложенно)"""
+        if self._coro is not None:
+            self._deferred_reasons |= reason
+            return
+        super().signal(reason, deadline)
+
+    def _process_internal(self):
+        """Запустить или продолжить корутину _process"""
+        if self._coro is not None:
+            fut = self._waiting_for
+            if fut is not None and not fut.done():
+                return
+            self.wake_reasons = self._run_reasons
+            self._step()
+            return
+        slots = self._slots()
+        if not slots.acquire(self):
+            self._keep_reasons()
+            return
+        try:
+            res = self._process()
+        except BaseException:
+            slots.release()
+            raise
+        if not inspect.iscoroutine(res):
+            slots.release()
+            return
+        self._coro = res
+        self._run_reasons = self.wake_reasons
+        self._step()
+
+    def _step(self):
+        """Выполнить корутину до очередного ожидания"""
+        self._waiting_for = None
+        try:
+            fut = self._coro.send(None)
+        except StopIteration:
+            self._finish()
+            return
+        except BaseException:
+            self._finish()
+            raise
+        if fut is None:
+            # голый yield (asyncio.sleep(0)) - продолжить на следующей итерации
+            ActiveObject.signal(self, WAKE_ASYNC)
+            return
+        if not getattr(fut, '_asyncio_future_blocking', False):
+            self._coro.close()
+            self._finish()
+            raise RuntimeError(f'Coroutine yielded non-future: {fut!r}')
+        fut._asyncio_future_blocking = False
+        self._waiting_for = fut
+        fut.add_done_callback(self._wake)
+
+    def _wake(self, fut):
+        if self._waiting_for is fut:
+            ActiveObject.signal(self, WAKE_ASYNC)
+            self.controller.wakeup()
+
+    def _finish(self):
+        self._coro = None
+        self._slots().release()
+        if self._deferred_reasons:
+            reasons = self._deferred_reasons
+            self._deferred_reasons = 0
+            self.signal(reasons)
+
+    def close(self):
+        """Закрыть объект (выполняемая корутина закрывается)"""
+        if self._coro is not None:
+            fut = self._waiting_for
+            if fut is not None:
+                fut.remove_done_callback(self._wake)
+                self._waiting_for = None
+            coro = self._coro
+            self._coro = None
+            coro.close()
+            self._slots().release()
+        elif self.slot_wait.in_list():
+            self.slot_wait.remove()
+        elif self._slot_granted:
+            self._slots().release()
+        self._deferred_reasons = 0
+        self._slot_granted = False
+        super().close()
@@ -1,23 +1,110 @@
 """Асинхронные задачи"""
 import asyncio
-from typing import Optional, Callable, List
+import heapq
+import itertools
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Callable, List, Dict, Any, Union
 
-from .active_objects import ActiveObject, ActiveObjectsController
+from .active_objects import ActiveObject, ActiveObjectsController, WAKE_ASYNC
 from .signals import Signaler, Listener
+from .output_capture import OutputCapture
+
+
+def get_timeout_stats(controller: ActiveObjectsController) -> Dict[str, int]:
+    """Число задач, превысивших дедлайн, по типам задач"""
+    stats = getattr(controller, 'task_timeouts', None)
+    if stats is None:
+        stats = controller.task_timeouts = {}
+    return stats
 
 
 class AbstractTask(ActiveObject):
-    """Абстрактная задача"""
+    """
+    Абстрактная задача. cache_key - отпечаток входных данных для
+    controller.task_cache (None - без кэширования). timeout (секунды или
+    timedelta) задает дедлайн deadline_at: по нему задача отменяется через
+    таймер контроллера, а если она не завершилась за timeout_grace -
+    отменяется с kill=True. Дедлайн передается дочерним задачам (add_child).
+    """
+
+    timeout_grace: Optional[timedelta] = timedelta(seconds=5)  # None - сразу kill
 
-    def __init__(self, controller, obj_id=None):
+    def __init__(self, controller, obj_id=None, cache_key=None,
+                 timeout: Union[float, timedelta, None] = None):
         super().__init__(controller, obj_id)
         self.exit_code: Optional[int] = None
         self._cancel_requested: bool = False
         self._kill_requested: bool = False
         self.error: Optional[Exception] = None
-        self.completed_signal = Signaler()
+        self.completed_signal = Signaler(WAKE_ASYNC)
+        self.cache_key = cache_key
+        self._cache_state: Optional[str] = None  # 'leader', 'waiting', 'hit'
+        self._cache_digest: Optional[str] = None
+        self.deadline_at: Optional[datetime] = None
+        self.timed_out: bool = False
+        self.children: List[AbstractTask] = []
+        if timeout is not None:
+            self.set_timeout(timeout)
         self.signal()
 
+    def set_timeout(self, timeout: Union[float, timedelta]) -> datetime:
+        """Установить дедлайн через timeout от текущего времени"""
+        if not isinstance(timeout, timedelta):
+            timeout = timedelta(seconds=timeout)
+        t = self.controller.now() + timeout
+        self.set_deadline(t)
+        return t
+
+    def set_deadline(self, t: Optional[datetime]):
+        """Установить дедлайн (остается более ранний из текущего и t)"""
+        if t is None or (self.deadline_at is not None and self.deadline_at <= t):
+            return
+        self.deadline_at = t
+        if self.exit_code is None:
+            self.schedule(t)
+        self.children = [c for c in self.children if c.exit_code is None]
+        for child in self.children:
+            child.set_deadline(t)
+
+    def add_child(self, child: 'AbstractTask') -> 'AbstractTask':
+        """Передать дедлайн дочерней задаче (и его последующие изменения)"""
+        self.children.append(child)
+        child.set_deadline(self.deadline_at)
+        return child
+
+    def _check_deadline(self):
+        if not self.reached(self.deadline_at):
+            return
+        if not self.timed_out:
+            self.timed_out = True
+            stats = get_timeout_stats(self.controller)
+            name = type(self).__name__
+            stats[name] = stats.get(name, 0) + 1
+            if self.timeout_grace is not None:
+                self.cancel()
+                if self.exit_code is None:
+                    self.schedule(self.deadline_at + self.timeout_grace)
+                return
+        elif self.timeout_grace is not None and not self.reached(self.deadline_at + self.timeout_grace):
+            return
+        self.cancel(kill=True)
+
+    def fingerprint(self):
+        """Отпечаток входных данных для кэша (переопределяется)"""
+        return self.cache_key
+
+    def _cached(self) -> bool:
+        """Завершить задачу из кэша или дождаться такой же (True - не запускать)"""
+        cache = getattr(self.controller, 'task_cache', None)
+        if cache is None or self.fingerprint() is None:
+            return False
+        return cache.lookup(self)
+
+    def _launch(self):
+        """Запустить выполнение (переопределяется задачами, использующими кэш)"""
+
     def is_completed(self, listener: Optional[Listener] = None) -> bool:
         """Проверить завершение задачи"""
         if self.exit_code is not None:
@@ -39,12 +126,16 @@ class AbstractTask(ActiveObject):
         if self.is_completed():
             self.completed_signal.signalAll()
             self.close()
+        elif self.deadline_at is not None:
+            self._check_deadline()
 
     def set_exit_code(self, exit_code: int):
         """Установить код завершения"""
         if self.exit_code is None:
-            self.signal()
+            self.signal(WAKE_ASYNC)
             self.exit_code = exit_code
+            if self._cache_state == 'leader':
+                self.controller.task_cache.complete(self)
 
     def cancel(self, kill: bool = False):
         """Отменить задачу"""
@@ -54,26 +145,170 @@ class AbstractTask(ActiveObject):
         if kill and not self._kill_requested:
             self._kill_requested = True
             self.signal()
+        if self._cache_state == 'waiting':
+            self.controller.task_cache.forget(self)
+            self.set_exit_code(-1)
+            self.completed_signal.signalAll()
 
     def close(self):
         """Закрыть задачу"""
+        if self._cache_state == 'leader':
+            self.controller.task_cache.complete(self)
+        elif self._cache_state == 'waiting':
+            self.controller.task_cache.forget(self)
         self.completed_signal.close()
         super().close()
 
 
+class TaskPool:
+    """
+    Ограничитель одновременно выполняемых AsyncTaskProcess контроллера:
+    общий лимит limit и лимиты по ключам задач (pool_key) key_limits, для
+    остальных ключей - default_key_limit. Задача сверх лимита ждет в
+    очереди и запускает корутину только при освобождении места. Порядок
+    допуска - FIFO, при priority=True - по возрастанию admission_priority
+    задачи (при равенстве - FIFO). Устанавливается в controller.task_pool.
+    """
+
+    def __init__(self, controller: ActiveObjectsController,
+                 limit: Optional[int] = None,
+                 key_limits: Optional[Dict[Any, int]] = None,
+                 default_key_limit: Optional[int] = None,
+                 priority: bool = False):
+        self.controller = controller
+        self.limit = limit
+        self.key_limits: Dict[Any, int] = dict(key_limits or {})
+        self.default_key_limit = default_key_limit
+        self.priority = priority
+        self.running: int = 0
+        self.running_by_key: Dict[Any, int] = {}
+        self.queues: Dict[Any, list] = {}  # ключ -> куча (приоритет, номер, задача)
+        self.queued: int = 0
+        self.max_queued: int = 0
+        self.started: int = 0
+        self.wait_time: float = 0.0  # суммарное ожидание в очереди, секунды
+        self._seq = itertools.count()
+        controller.task_pool = self
+
+    def _has_slot(self, key) -> bool:
+        if self.limit is not None and self.running >= self.limit:
+            return False
+        key_limit = self.key_limits.get(key, self.default_key_limit)
+        return key_limit is None or self.running_by_key.get(key, 0) < key_limit
+
+    def submit(self, task: 'AsyncTaskProcess'):
+        """Запустить задачу или поставить ее в очередь"""
+        prio = task.admission_priority if self.priority else 0
+        heapq.heappush(self.queues.setdefault(task.pool_key, []),
+                       (prio, next(self._seq), task))
+        task._queued_at = time.perf_counter()
+        self.queued += 1
+        if self.queued > self.max_queued:
+            self.max_queued = self.queued
+        self._admit()
+
+    def remove(self, task: 'AsyncTaskProcess'):
+        """Убрать задачу из очереди (запись в куче удаляется при допуске)"""
+        if task._queued_at is not None:
+            task._queued_at = None
+            self.queued -= 1
+
+    def release(self, task: 'AsyncTaskProcess'):
+        """Освободить место завершившейся задачи"""
+        key = task.pool_key
+        self.running -= 1
+        n = self.running_by_key[key] - 1
+        if n:
+            self.running_by_key[key] = n
+        else:
+            del self.running_by_key[key]
+        self._admit()
+
+    def _admit(self):
+        while self.limit is None or self.running < self.limit:
+            best = None
+            for key, q in list(self.queues.items()):
+                while q and q[0][2]._queued_at is None:
+                    heapq.heappop(q)
+                if not q:
+                    del self.queues[key]
+                elif self._has_slot(key) and (best is None or q[0][:2] < best[:2]):
+                    best = q[0]
+            if best is None:
+                return
+            task: AsyncTaskProcess = best[2]
+            heapq.heappop(self.queues[task.pool_key])
+            self.wait_time += time.perf_counter() - task._queued_at
+            task._queued_at = None
+            self.queued -= 1
+            self.running += 1
+            self.running_by_key[task.pool_key] = self.running_by_key.get(task.pool_key, 0) + 1
+            self.started += 1
+            task._start()
+            task.task.add_done_callback(lambda _, t=task: self.release(t))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика: выполняются, в очереди, по ключам"""
+        keys = {}
+        for key in set(self.queues) | set(self.running_by_key):
+            keys[key] = {
+                'limit': self.key_limits.get(key, self.default_key_limit),
+                'running': self.running_by_key.get(key, 0),
+                'queued': sum(1 for e in self.queues.get(key, ())
+                              if e[2]._queued_at is not None)
+            }
+        return {
+            'limit': self.limit,
+            'running': self.running,
+            'queued': self.queued,
+            'max_queued': self.max_queued,
+            'started': self.started,
+            'mean_wait': self.wait_time / self.started if self.started else 0.0,
+            'keys': keys
+        }
+
+
 class AsyncTaskProcess(AbstractTask):
-    """Асинхронный процесс"""
+    """
+    Асинхронный процесс. Если у контроллера есть TaskPool, корутина
+    запускается только после допуска пулом (ключ pool_key, приоритет
+    допуска admission_priority). С cache_key и controller.task_cache
+    повторный запуск с тем же отпечатком берет результат из кэша.
+    """
 
     def __init__(self, controller: ActiveObjectsController,
-                 task_func: Optional[Callable] = None):
+                 task_func: Optional[Callable] = None,
+                 pool_key=None, admission_priority: int = 0, cache_key=None,
+                 timeout: Union[float, timedelta, None] = None):
         self.task_func = task_func
         self.task: Optional[asyncio.Task] = None
         self._cancel_async_task = True
-        super().__init__(controller)
+        self.pool_key = pool_key
+        self.admission_priority = admission_priority
+        self._queued_at: Optional[float] = None  # время постановки в очередь пула
+        super().__init__(controller, cache_key=cache_key, timeout=timeout)
+        if not self._cached():
+            self._launch()
+
+    def _launch(self):
+        """Запустить сразу или через TaskPool"""
+        pool: Optional[TaskPool] = getattr(self.controller, 'task_pool', None)
+        if pool is None:
+            self._start()
+        else:
+            pool.submit(self)
+
+    def _start(self):
+        """Запустить корутину задачи"""
         self.task = asyncio.create_task(self._do_task())
 
+    def is_queued(self) -> bool:
+        """Ожидает ли задача допуска в TaskPool"""
+        return self._queued_at is not None
+
     async def _do_task(self):
         """Выполнить задачу"""
+        start = time.perf_counter()
         try:
             exit_code = await self.do_task()
             if self._cancel_async_task:
@@ -83,6 +318,11 @@ class AsyncTaskProcess(AbstractTask):
             self.error = e
             self.set_exit_code(-1)
         self.completed_signal.signalAll()
+        monitors = self.controller.monitors
+        if monitors:
+            duration = time.perf_counter() - start
+            for m in monitors:
+                m.on_task_completed(self, duration)
         self.controller.wakeup()
 
     async def do_task(self) -> int:
@@ -93,6 +333,11 @@ class AsyncTaskProcess(AbstractTask):
 
     def cancel_async_task(self, kill: bool):
         """Отменить асинхронную задачу"""
+        if self._queued_at is not None:
+            self.controller.task_pool.remove(self)
+            self.set_exit_code(-1)
+            self.completed_signal.signalAll()
+            return
         if self.task and not self.task.done():
             self.task.cancel("Killed" if kill else "Canceled")
             self.set_exit_code(-1)
@@ -106,12 +351,134 @@ class AsyncTaskProcess(AbstractTask):
 
     def close(self):
         """Закрыть процесс"""
+        if self._queued_at is not None:
+            self.controller.task_pool.remove(self)
         if self.task:
             self.task.cancel()
             self.task = None
         super().close()
 
 
+_thread_executor: Optional[ThreadPoolExecutor] = None
+_process_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_thread_executor(max_workers: Optional[int] = None) -> ThreadPoolExecutor:
+    """Общий пул потоков задач (max_workers учитывается при создании)"""
+    global _thread_executor
+    if _thread_executor is None:
+        _thread_executor = ThreadPoolExecutor(max_workers, thread_name_prefix='ao-task')
+    return _thread_executor
+
+
+def get_process_executor(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Общий пул процессов задач (max_workers учитывается при создании)"""
+    global _process_executor
+    if _process_executor is None:
+        _process_executor = ProcessPoolExecutor(max_workers)
+    return _process_executor
+
+
+def shutdown_executors(wait: bool = True):
+    """Остановить общие пулы задач"""
+    global _thread_executor, _process_executor
+    if _thread_executor is not None:
+        _thread_executor.shutdown(wait)
+        _thread_executor = None
+    if _process_executor is not None:
+        _process_executor.shutdown(wait)
+        _process_executor = None
+
+
+class ExecutorTask(AbstractTask):
+    """
+    Задача, выполняющая func(*args, **kwargs) в пуле executor. Результат
+    сохраняется в result, exit_code = 0 (ошибка или отмена - -1, исключение
+    в error). Завершение доставляется в поток контроллера через
+    threadsafe_async_call. Отмена снимает задачу, еще не начавшую
+    выполняться; уже выполняемая задача при cancel(kill=True) сразу
+    считается завершенной с -1, а ее результат отбрасывается.
+    """
+
+    def __init__(self, controller: ActiveObjectsController, func: Callable,
+                 args: tuple = (), kwargs: Optional[Dict[str, Any]] = None,
+                 executor: Optional[Executor] = None, cache_key=None,
+                 timeout: Union[float, timedelta, None] = None):
+        super().__init__(controller, cache_key=cache_key, timeout=timeout)
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.result: Any = None
+        self.executor = executor if executor is not None else self.default_executor()
+        self._start_time = time.perf_counter()
+        self.future: Optional[Future] = None
+        if not self._cached():
+            self._launch()
+
+    def _launch(self):
+        """Отправить func в пул"""
+        self._start_time = time.perf_counter()
+        self.future = self.executor.submit(self.func, *self.args, **self.kwargs)
+        self.future.add_done_callback(
+            lambda f: self.controller.threadsafe_async_call(self._future_done, (f,)))
+
+    def default_executor(self) -> Executor:
+        """Пул по умолчанию (переопределяется)"""
+        return get_thread_executor()
+
+    def _future_done(self, future: Future):
+        """Завершение в пуле (в потоке контроллера)"""
+        if self.exit_code is not None:
+            return
+        if future.cancelled():
+            self.set_exit_code(-1)
+        else:
+            error = future.exception()
+            if error is None:
+                self.result = future.result()
+                self.set_exit_code(0)
+            else:
+                self.error = error
+                self.set_exit_code(-1)
+        self.completed_signal.signalAll()
+        monitors = self.controller.monitors
+        if monitors:
+            duration = time.perf_counter() - self._start_time
+            for m in monitors:
+                m.on_task_completed(self, duration)
+
+    def cancel(self, kill: bool = False):
+        """Отменить задачу"""
+        super().cancel(kill)
+        if self.future is None or self.exit_code is not None:
+            return
+        if self.future.cancel() or kill:
+            self.set_exit_code(-1)
+            self.completed_signal.signalAll()
+
+    def close(self):
+        """Закрыть задачу"""
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+        super().close()
+
+
+class ThreadPoolTask(ExecutorTask):
+    """Задача в общем пуле потоков: результат передается без копирования"""
+
+
+class ProcessPoolTask(ExecutorTask):
+    """
+    Задача в общем пуле процессов для вычислений на Python. Функция,
+    аргументы и результат передаются через pickle, поэтому func должна
+    быть функцией верхнего уровня модуля.
+    """
+
+    def default_executor(self) -> Executor:
+        return get_process_executor()
+
+
 def test_process(task) -> AsyncTaskProcess:
     """Тестовый процесс"""
 
@@ -123,30 +490,54 @@ def test_process(task) -> AsyncTaskProcess:
 
 
 class SystemTaskProcess(AsyncTaskProcess):
-    """Системный процесс"""
+    """
+    Системный процесс. С capture (OutputCapture) stdout/stderr читаются
+    потоково; такой процесс запускается напрямую, без controller.spawn_pool.
+    """
 
     def __init__(self, controller: ActiveObjectsController,
-                 commands: List[str], cwd: Optional[str] = None):
-        super().__init__(controller)
+                 commands: List[str], cwd: Optional[str] = None,
+                 pool_key=None, admission_priority: int = 0,
+                 capture: Optional[OutputCapture] = None, cache_key=None,
+                 timeout: Union[float, timedelta, None] = None):
         self.commands = commands
         self.cwd = cwd
+        self.capture = capture
+        super().__init__(controller, pool_key=pool_key,
+                         admission_priority=admission_priority, cache_key=cache_key,
+                         timeout=timeout)
         self.proc: Optional[asyncio.subprocess.Process] = None
         self._cancel_async_task = False
 
     async def do_task(self) -> int:
-        """Выполнить системную команду"""
+        """Выполнить системную команду (через controller.spawn_pool, если есть)"""
+        capture = self.capture
+        pool = getattr(self.controller, 'spawn_pool', None)
+        if pool is not None and capture is None:
+            self.proc = pool.run(self.commands, self.cwd)
+            return await self.proc.wait()
+        pipe = asyncio.subprocess.PIPE
+        devnull = asyncio.subprocess.DEVNULL
         self.proc = await asyncio.create_subprocess_exec(
             self.commands[0],
             *self.commands[1:],
-            stdout=asyncio.subprocess.DEVNULL,
-            stderr=asyncio.subprocess.DEVNULL,
+            stdout=devnull if capture is None else pipe,
+            stderr=pipe if capture is not None and capture.capture_stderr else devnull,
             cwd=self.cwd
         )
+        if capture is not None:
+            capture.attach(self.controller)
+            readers = [capture.read(self.proc.stdout, 'stdout')]
+            if capture.capture_stderr:
+                readers.append(capture.read(self.proc.stderr, 'stderr'))
+            await asyncio.gather(*readers)
         return await self.proc.wait()
 
     def cancel(self, kill: bool = False):
         """Отменить системный процесс"""
         super().cancel(kill)
+        if self.capture is not None:
+            self.capture.close()
         if self.proc is not None:
             if kill:
                 self.proc.kill()
@@ -157,5 +548,7 @@ class SystemTaskProcess(AsyncTaskProcess):
 
     def close(self):
         """Закрыть системный процесс"""
+        if self.capture is not None:
+            self.capture.close()
         self.proc = None
-        super().close()
\ No newline at end of file
+        super().close()
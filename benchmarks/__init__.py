@@ -0,0 +1,16 @@
+"""
+Бенчмарки контроллера и структур данных.
+Запуск: python -m py_active_objects.benchmarks [--quick] [--json FILE]
+"""
+
+from .runner import BENCHMARKS, benchmark, result, run, save, compare
+from . import controller, signaling, db, simulation, scenarios, threaded, async_objects, spawn
+
+__all__ = [
+    'BENCHMARKS',
+    'benchmark',
+    'result',
+    'run',
+    'save',
+    'compare'
+]
@@ -0,0 +1,34 @@
+"""Запуск бенчмарков из командной строки"""
+import argparse
+import json
+
+from . import BENCHMARKS, run, save, compare
+
+
+def main():
+    parser = argparse.ArgumentParser(description='py_active_objects benchmarks')
+    parser.add_argument('names', nargs='*', help='префиксы имен бенчмарков')
+    parser.add_argument('--quick', action='store_true', help='уменьшенные размеры')
+    parser.add_argument('--json', help='сохранить результаты в файл')
+    parser.add_argument('--compare', help='сравнить с сохраненными результатами')
+    parser.add_argument('--list', action='store_true', help='список бенчмарков')
+    args = parser.parse_args()
+
+    if args.list:
+        for name in BENCHMARKS:
+            print(name)
+        return
+
+    report = run(args.names, quick=args.quick)
+    if args.json:
+        save(report, args.json)
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)
+        print()
+        for line in compare(base, report):
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
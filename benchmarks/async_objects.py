@@ -0,0 +1,91 @@
+"""Бенчмарк AsyncActiveObject против задач AsyncTaskProcess"""
+import asyncio
+import time
+from typing import Optional
+
+from ..active_objects import ActiveObject, ActiveObjectsController, async_loop
+from ..async_objects import AsyncActiveObject
+from ..async_tasks import AsyncTaskProcess
+from ..signals import AOListener
+from .runner import benchmark, result
+
+
+async def _op():
+    """Операция с одним ожиданием future, готового на следующей итерации цикла"""
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+    loop.call_soon(fut.set_result, None)
+    await fut
+
+
+class TaskDriver(ActiveObject):
+    """Выполняет операции по одной, каждую - отдельной AsyncTaskProcess"""
+
+    def __init__(self, controller, ops: int, done: list):
+        self.left = ops
+        self.done = done
+        self.task: Optional[AsyncTaskProcess] = None
+        self.listener = AOListener(self)
+        super().__init__(controller)
+
+    def _process(self):
+        while True:
+            if self.task is None:
+                if self.left == 0:
+                    self.done.append(self)
+                    return
+                self.task = AsyncTaskProcess(self.controller, _op)
+            if not self.task.is_completed(self.listener):
+                return
+            self.task = None
+            self.left -= 1
+
+
+class CoroDriver(AsyncActiveObject):
+    """Выполняет операции по одной в async _process"""
+
+    def __init__(self, controller, ops: int, done: list):
+        self.left = ops
+        self.done = done
+        super().__init__(controller)
+
+    async def _process(self):
+        if self.left == 0:
+            return
+        await _op()
+        self.left -= 1
+        if self.left:
+            self.signal()
+        else:
+            self.done.append(self)
+
+
+def _run(cls, drivers: int, ops: int) -> float:
+    async def main() -> float:
+        controller = ActiveObjectsController()
+        done = []
+        start = time.perf_counter()
+        for _ in range(drivers):
+            cls(controller, ops, done)
+        loop_task = asyncio.create_task(async_loop(controller))
+        while len(done) < drivers:
+            await asyncio.sleep(0.001)
+        seconds = time.perf_counter() - start
+        controller.terminate()
+        controller.wakeup()
+        await loop_task
+        return seconds
+
+    return asyncio.run(main())
+
+
+@benchmark('async_objects.ops')
+def bench_async_objects(quick: bool):
+    res = []
+    ops = 100 if quick else 1000
+    for drivers in ([10, 100] if quick else [10, 100, 1000]):
+        for name, cls in (('task_process', TaskDriver), ('async_process', CoroDriver)):
+            seconds = _run(cls, drivers, ops)
+            res.append(result(f'async_objects.{name}', drivers * ops, seconds,
+                              drivers=drivers))
+    return res
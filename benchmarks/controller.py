@@ -0,0 +1,250 @@
+"""Бенчмарки контроллера: планирование, диспетчеризация, поиск, пробуждение"""
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from ..active_objects import ActiveObject, ActiveObjectsController, async_loop
+from .runner import benchmark, result, timed
+
+START = datetime(2000, 1, 1)
+
+
+class NoopObject(ActiveObject):
+    """Объект с пустой обработкой"""
+    type_id = 'noop'
+
+
+def _controller(priority_count: int = 1) -> ActiveObjectsController:
+    controller = ActiveObjectsController(priority_count)
+    controller.emulated_time = START
+    return controller
+
+
+def _drain(controller: ActiveObjectsController):
+    while any(q.count for q in controller.signaled):
+        controller.process()
+
+
+def percentiles(values: List[float]) -> dict:
+    """p50/p99/max по списку значений"""
+    if not values:
+        return {'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+    values = sorted(values)
+    return {
+        'p50': values[len(values) // 2],
+        'p99': values[min(len(values) - 1, int(len(values) * 0.99))],
+        'max': values[-1]
+    }
+
+
+@benchmark('controller.create')
+def bench_create(quick: bool):
+    res = []
+    for n in ([1000, 10000] if quick else [1000, 10000, 100000, 1000000]):
+        controller = _controller()
+        t = time.perf_counter()
+        for i in range(n):
+            NoopObject(controller, i)
+        res.append(result('controller.create', n, time.perf_counter() - t, objects=n))
+    return res
+
+
+@benchmark('controller.schedule_churn')
+def bench_schedule_churn(quick: bool):
+    res = []
+    rnd = random.Random(1)
+    for n in ([1000, 10000] if quick else [1000, 10000, 100000, 1000000]):
+        controller = _controller()
+        objs = [NoopObject(controller, i) for i in range(n)]
+        _drain(controller)
+        rounds = max(1, 100000 // n) if quick else max(1, 1000000 // n)
+        offsets = [timedelta(seconds=rnd.random() * 3600) for _ in range(n)]
+
+        def churn():
+            for _ in range(rounds):
+                for o, d in zip(objs, offsets):
+                    o.unschedule()
+                    o.schedule(START + d)
+
+        seconds = timed(churn, repeat=1 if n >= 100000 else 3)
+        res.append(result('controller.schedule_churn', n * rounds, seconds, objects=n))
+    return res
+
+
+@benchmark('controller.dispatch')
+def bench_dispatch(quick: bool):
+    res = []
+    n = 10000
+    rounds = 5 if quick else 50
+    for priority_count in (1, 2, 4, 8):
+        controller = _controller(priority_count)
+        objs = [NoopObject(controller, i) for i in range(n)]
+        for i, o in enumerate(objs):
+            o.priority = i % priority_count
+        _drain(controller)
+
+        def dispatch():
+            for _ in range(rounds):
+                for o in objs:
+                    o.signal()
+                _drain(controller)
+
+        seconds = timed(dispatch)
+        res.append(result('controller.dispatch', n * rounds, seconds,
+                          priority_count=priority_count))
+    return res
+
+
+@benchmark('controller.find')
+def bench_find(quick: bool):
+    res = []
+    rnd = random.Random(1)
+    for n in ([1000, 10000] if quick else [1000, 10000, 100000, 1000000]):
+        controller = _controller()
+        for i in range(n):
+            NoopObject(controller, i)
+        keys = [rnd.randrange(n) for _ in range(100000)]
+
+        def find():
+            for k in keys:
+                controller.find('noop', k)
+
+        res.append(result('controller.find', len(keys), timed(find), objects=n))
+    return res
+
+
+@benchmark('controller.async_wakeup')
+def bench_async_wakeup(quick: bool):
+    n = 1000 if quick else 10000
+    signal_latency = []
+    timer_latency = []
+
+    class Probe(ActiveObject):
+
+        def __init__(self, controller):
+            self.sent = None
+            self.timer_at = None
+            super().__init__(controller)
+
+        def _process(self):
+            now = time.perf_counter()
+            if self.sent is not None:
+                signal_latency.append(now - self.sent)
+                self.sent = None
+            if self.timer_at is not None and self.reached(self.t_due):
+                timer_latency.append(now - self.timer_at)
+                self.timer_at = None
+
+    async def main() -> float:
+        controller = ActiveObjectsController()
+        probe = Probe(controller)
+        loop_task = asyncio.create_task(async_loop(controller))
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        for i in range(n):
+            probe.sent = time.perf_counter()
+            probe.signal()
+            controller.wakeup()
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            if i % 10 == 0:
+                probe.t_due = probe.schedule_milliseconds(1)
+                probe.timer_at = time.perf_counter() + 0.001
+                await asyncio.sleep(0.002)
+        seconds = time.perf_counter() - start
+        controller.terminate()
+        await loop_task
+        return seconds
+
+    seconds = asyncio.run(main())
+    r1 = result('controller.async_wakeup.signal', len(signal_latency), seconds)
+    r1.update(percentiles(signal_latency))
+    r2 = result('controller.async_wakeup.timer', len(timer_latency), seconds)
+    r2.update(percentiles(timer_latency))
+    return [r1, r2]
+
+
+async def _wait_for_loop(controller: ActiveObjectsController):
+    """Прежняя реализация async_loop (asyncio.Event + wait_for) для сравнения"""
+    controller.terminated = False
+    controller.emulated_time = None
+    event = asyncio.Event()
+    controller.wakeup = event.set
+    while not controller.terminated:
+        next_time = controller.process()
+        if controller.terminated:
+            return
+        if not event.is_set():
+            if next_time:
+                delta = (next_time - controller.now()).total_seconds()
+                if delta > 0:
+                    try:
+                        await asyncio.wait_for(event.wait(), timeout=delta)
+                    except asyncio.TimeoutError:
+                        pass
+            else:
+                await event.wait()
+        event.clear()
+
+
+def _event_loops() -> List[tuple]:
+    loops = [('asyncio', asyncio.new_event_loop)]
+    try:
+        import uvloop
+        loops.append(('uvloop', uvloop.new_event_loop))
+    except ImportError:
+        pass
+    return loops
+
+
+@benchmark('controller.async_timers')
+def bench_async_timers(quick: bool):
+    res = []
+    duration = 1.0 if quick else 5.0
+    count = 10
+
+    class Ticker(ActiveObject):
+
+        def __init__(self, controller, stats: list):
+            self.stats = stats
+            self.t_due = None
+            super().__init__(controller)
+
+        def _process(self):
+            if self.t_due is not None:
+                self.stats.append(time.perf_counter() - self.t_due)
+            self.t_due = time.perf_counter() + 0.001
+            self.schedule_milliseconds(1)
+
+    for loop_name, new_loop in _event_loops():
+        for impl, loop_func in (('call_at', async_loop), ('wait_for', _wait_for_loop)):
+            lateness = []
+
+            async def main():
+                controller = ActiveObjectsController()
+                for _ in range(count):
+                    Ticker(controller, lateness)
+                loop_task = asyncio.create_task(loop_func(controller))
+                cpu = time.process_time()
+                start = time.perf_counter()
+                await asyncio.sleep(duration)
+                seconds = time.perf_counter() - start
+                cpu = time.process_time() - cpu
+                controller.terminate()
+                await loop_task
+                return seconds, cpu
+
+            loop = new_loop()
+            try:
+                seconds, cpu = loop.run_until_complete(main())
+            finally:
+                loop.close()
+            r = result('controller.async_timers', len(lateness), seconds,
+                       loop=loop_name, impl=impl)
+            r['cpu_per_wakeup'] = cpu / len(lateness) if lateness else 0.0
+            r['cpu_load'] = cpu / seconds
+            r.update(percentiles(lateness))
+            res.append(r)
+    return res
@@ -0,0 +1,47 @@
+"""Бенчмарки объектов БД"""
+from .runner import benchmark, result, timed
+from ..db_active_objects import DbObject
+from .controller import _controller
+
+
+class Column:
+    """Описание колонки курсора"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class FakeCursor:
+    """Курсор с заранее заданными строками"""
+
+    def __init__(self, columns, rows):
+        self.description = [Column(c) for c in columns]
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+
+class BenchDbObject(DbObject):
+    """Объект таблицы для бенчмарка"""
+    type_id = 'bench_db'
+    table_name = 'bench'
+    table_fields = ['version', 'name', 'value', 'state']
+    version_field_name = 'version'
+
+
+@benchmark('db.refresh_db_states')
+def bench_refresh_db_states(quick: bool):
+    res = []
+    columns = ['id'] + BenchDbObject.table_fields
+    for n in ([1000, 10000] if quick else [1000, 10000, 100000]):
+        rows = [(i, 1, f'name{i}', i * 1.5, 'new') for i in range(n)]
+        updated = [(i, 2, f'name{i}', i * 2.5, 'done') for i in range(n)]
+        controller = _controller()
+        cursor = FakeCursor(columns, rows)
+        seconds = timed(lambda: BenchDbObject.refresh_db_states(controller, cursor), repeat=1)
+        res.append(result('db.refresh_db_states.load', n, seconds, rows=n))
+        cursor = FakeCursor(columns, updated)
+        seconds = timed(lambda: BenchDbObject.refresh_db_states(controller, cursor))
+        res.append(result('db.refresh_db_states.update', n, seconds, rows=n))
+    return res
@@ -0,0 +1,102 @@
+"""Реестр и запуск бенчмарков"""
+import gc
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Any
+
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+def benchmark(name: str):
+    """Декоратор регистрации бенчмарка. Функция получает quick: bool и
+    возвращает список результатов (см. result())"""
+
+    def register(func: Callable) -> Callable:
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+def result(name: str, ops: int, seconds: float, **params) -> Dict[str, Any]:
+    """Результат одного измерения"""
+    return {
+        'name': name,
+        'params': params,
+        'ops': ops,
+        'seconds': seconds,
+        'ops_per_sec': ops / seconds if seconds > 0 else 0.0
+    }
+
+
+def timed(func: Callable, repeat: int = 3) -> float:
+    """Лучшее из repeat время выполнения func(), секунды"""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        t = time.perf_counter()
+        func()
+        t = time.perf_counter() - t
+        if best is None or t < best:
+            best = t
+    return best
+
+
+def run(names: Optional[List[str]] = None, quick: bool = False,
+        verbose: bool = True) -> Dict[str, Any]:
+    """Запустить бенчмарки (все, если names не задан)"""
+    results = []
+    for name, func in BENCHMARKS.items():
+        if names and not any(name.startswith(n) for n in names):
+            continue
+        for r in func(quick):
+            results.append(r)
+            if verbose:
+                print(format_result(r))
+                sys.stdout.flush()
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': sys.version,
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'quick': quick
+        },
+        'results': results
+    }
+
+
+def _key(r: Dict[str, Any]) -> str:
+    params = ','.join(f'{k}={v}' for k, v in sorted(r['params'].items()))
+    return f"{r['name']}[{params}]"
+
+
+def format_result(r: Dict[str, Any]) -> str:
+    """Строка с результатом"""
+    extra = ''.join(f' {k}={v:.6g}' for k, v in r.items()
+                    if k not in ('name', 'params', 'ops', 'seconds', 'ops_per_sec')
+                    and isinstance(v, (int, float)))
+    return f"{_key(r):<60} {r['ops_per_sec']:>14,.0f} ops/s{extra}"
+
+
+def save(report: Dict[str, Any], path: str):
+    """Сохранить отчет в JSON"""
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=1)
+
+
+def compare(base: Dict[str, Any], report: Dict[str, Any]) -> List[str]:
+    """Сравнить отчет с базовым: строки 'бенчмарк: изменение ops/s'"""
+    base_results = {_key(r): r for r in base['results']}
+    lines = []
+    for r in report['results']:
+        b = base_results.get(_key(r))
+        if b is None or not b['ops_per_sec']:
+            continue
+        ratio = r['ops_per_sec'] / b['ops_per_sec']
+        lines.append(f"{_key(r):<60} {ratio:>7.2f}x "
+                     f"({b['ops_per_sec']:,.0f} -> {r['ops_per_sec']:,.0f} ops/s)")
+    return lines
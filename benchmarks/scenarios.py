@@ -0,0 +1,34 @@
+"""Бенчмарк параллельного прогона сценариев"""
+import os
+import time
+from datetime import timedelta
+
+from ..scenarios import run_scenarios
+from .runner import benchmark, result
+from .controller import START
+from .workload import TypeSpec, build_population
+
+
+def build_workload(controller, n):
+    """Сценарий: популяция из n тикающих и n реагирующих объектов"""
+    stats = build_population(controller, [TypeSpec('tick', count=n, period=1.0, fanout=1),
+                                          TypeSpec('react', count=n, period=None)],
+                             allow_async=False)
+    return lambda: stats.processed
+
+
+@benchmark('scenarios.parallel')
+def bench_parallel(quick: bool):
+    res = []
+    count = 8
+    n = 200 if quick else 1000
+    cpus = os.cpu_count() or 1
+    for processes in sorted({1, cpus}):
+        t = time.perf_counter()
+        results = run_scenarios(build_workload, [n] * count, START,
+                                timedelta(seconds=60), processes=processes)
+        seconds = time.perf_counter() - t
+        r = result('scenarios.parallel', count, seconds, processes=processes)
+        r['processed'] = sum(s.result for s in results if s.ok)
+        res.append(r)
+    return res
@@ -0,0 +1,37 @@
+"""Бенчмарки сигналов"""
+import time
+
+from ..active_objects import ActiveObject
+from ..signals import Signaler, AOListener
+from .runner import benchmark, result
+from .controller import _controller, _drain
+
+
+class ListeningObject(ActiveObject):
+    """Объект-слушатель"""
+    type_id = 'listener'
+
+    def __init__(self, controller, obj_id):
+        super().__init__(controller, obj_id)
+        self.listener = AOListener(self)
+
+
+@benchmark('signals.signal_all')
+def bench_signal_all(quick: bool):
+    res = []
+    for n in ([10, 100, 1000] if quick else [10, 100, 1000, 10000, 100000]):
+        controller = _controller()
+        signaler = Signaler()
+        objs = [ListeningObject(controller, i) for i in range(n)]
+        _drain(controller)
+        rounds = max(1, (100000 if quick else 1000000) // n)
+        seconds = 0.0
+        for _ in range(rounds):
+            t = time.perf_counter()
+            for o in objs:
+                o.listener.wait(signaler)
+            signaler.signalAll()
+            seconds += time.perf_counter() - t
+            _drain(controller)
+        res.append(result('signals.signal_all', n * rounds, seconds, listeners=n))
+    return res
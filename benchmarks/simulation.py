@@ -0,0 +1,29 @@
+"""Бенчмарк симуляции в виртуальном времени"""
+import time
+from datetime import timedelta
+
+from ..active_objects import ActiveObjectsController
+from ..simulation import Simulation
+from .runner import benchmark, result
+from .controller import START
+from .workload import TypeSpec, build_population
+
+
+@benchmark('simulation.run_until')
+def bench_simulation(quick: bool):
+    res = []
+    virtual = 60 if quick else 600
+    for n in ([1000, 10000] if quick else [1000, 10000, 100000]):
+        specs = [TypeSpec('tick', count=n, period=1.0, fanout=1),
+                 TypeSpec('react', count=n, period=None)]
+        controller = ActiveObjectsController()
+        controller.emulated_time = START
+        stats = build_population(controller, specs, allow_async=False)
+        sim = Simulation(controller, START)
+        t = time.perf_counter()
+        sim.run_until(START + timedelta(seconds=virtual))
+        seconds = time.perf_counter() - t
+        r = result('simulation.run_until', stats.processed, seconds, objects=2 * n)
+        r['simulated_per_wall'] = virtual / seconds
+        res.append(r)
+    return res
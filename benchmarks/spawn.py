@@ -0,0 +1,77 @@
+"""Бенчмарк запуска системных команд: напрямую и через SpawnPool"""
+import asyncio
+import time
+
+from ..active_objects import ActiveObjectsController, async_loop
+from ..async_tasks import SystemTaskProcess, TaskPool
+from ..spawn_pool import SpawnPool
+from .runner import benchmark, result
+
+
+def _run(n: int, concurrency: int, pooled: bool) -> float:
+    async def main() -> float:
+        controller = ActiveObjectsController()
+        if pooled:
+            pool = SpawnPool(controller, concurrency)
+            pool.start()
+            await asyncio.sleep(0.2)  # рабочие процессы запускаются
+        else:
+            pool = None
+            TaskPool(controller, limit=concurrency)
+        loop_task = asyncio.create_task(async_loop(controller))
+        start = time.perf_counter()
+        tasks = [SystemTaskProcess(controller, ['true']) for _ in range(n)]
+        while any(t.exit_code is None for t in tasks):
+            await asyncio.sleep(0.005)
+        seconds = time.perf_counter() - start
+        controller.terminate()
+        await loop_task
+        if pool is not None:
+            pool.close()
+        return seconds
+
+    return asyncio.run(main())
+
+
+@benchmark('spawn.commands')
+def bench_spawn(quick: bool):
+    res = []
+    n = 200 if quick else 2000
+    for concurrency in ([4] if quick else [1, 4, 16]):
+        for name, pooled in (('direct', False), ('pool', True)):
+            seconds = _run(n, concurrency, pooled)
+            res.append(result(f'spawn.{name}', n, seconds, concurrency=concurrency))
+    return res
+
+
+class _KillAtDeadline(SystemTaskProcess):
+    timeout_grace = None
+
+
+def _run_timeout(n: int, kill: bool) -> float:
+    async def main() -> float:
+        controller = ActiveObjectsController()
+        loop_task = asyncio.create_task(async_loop(controller))
+        cls = _KillAtDeadline if kill else SystemTaskProcess
+        start = time.perf_counter()
+        tasks = [cls(controller, ['sleep', '1'], timeout=0.05) for _ in range(n)]
+        while any(t.exit_code is None for t in tasks) and not loop_task.done():
+            await asyncio.sleep(0.005)
+        seconds = time.perf_counter() - start
+        controller.terminate()
+        await loop_task
+        if not all(t.timed_out for t in tasks):
+            raise RuntimeError('task finished without timeout')
+        return seconds
+
+    return asyncio.run(main())
+
+
+@benchmark('spawn.timeout')
+def bench_spawn_timeout(quick: bool):
+    """Отмена команд по дедлайну: cancel и сразу kill (timeout_grace = None)"""
+    res = []
+    n = 20 if quick else 100
+    for name, kill in (('cancel', False), ('kill', True)):
+        res.append(result(f'spawn.timeout.{name}', n, _run_timeout(n, kill)))
+    return res
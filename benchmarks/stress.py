@@ -0,0 +1,154 @@
+"""
+Нагрузочный прогон синтетической популяции объектов.
+Запуск: python -m py_active_objects.benchmarks.stress --help
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import List, Dict, Any
+
+from ..active_objects import ActiveObjectsController, async_loop, simple_loop, emulate_asap
+from ..metrics import ControllerMetrics, LogHistogram
+from .workload import TypeSpec, StopObject, build_population
+
+
+def max_rss_kb() -> int:
+    """Пиковый размер резидентной памяти процесса, КБ"""
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        return 0
+
+
+def default_specs(types: int, objects: int, period: float, fanout: int,
+                  work: int, failure_rate: float, async_rate: float) -> List[TypeSpec]:
+    """Одинаковые типы: первый с таймером, остальные реагируют на сигналы"""
+    specs = []
+    for i in range(types):
+        specs.append(TypeSpec(
+            name=f't{i}', count=objects,
+            period=period if i == 0 else None,
+            fanout=fanout, work=work,
+            failure_rate=failure_rate, async_rate=async_rate
+        ))
+    return specs
+
+
+def _merge(histograms: List[LogHistogram]) -> LogHistogram:
+    res = LogHistogram()
+    for h in histograms:
+        if len(h.counts) > len(res.counts):
+            res.counts.extend([0] * (len(h.counts) - len(res.counts)))
+        for i, c in enumerate(h.counts):
+            res.counts[i] += c
+        res.count += h.count
+        res.total += h.total
+        if h.min is not None and (res.min is None or h.min < res.min):
+            res.min = h.min
+        res.max = max(res.max, h.max)
+    return res
+
+
+def run_stress(specs: List[TypeSpec], loop: str = 'async', duration: float = 10.0,
+               seed: int = 1, metrics: bool = True,
+               priority_count: int = 1) -> Dict[str, Any]:
+    """Построить популяцию и прогнать ее в выбранном цикле"""
+    controller = ActiveObjectsController(priority_count)
+    monitor = controller.add_monitor(ControllerMetrics()) if metrics else None
+    start_time = datetime(2000, 1, 1)
+    if loop == 'emulate':
+        controller.emulated_time = start_time
+    stats = build_population(controller, specs, seed, allow_async=(loop == 'async'))
+    StopObject(controller, duration)
+    rss_before = max_rss_kb()
+
+    wall = time.perf_counter()
+    if loop == 'async':
+        asyncio.run(async_loop(controller))
+    elif loop == 'simple':
+        simple_loop(controller)
+    elif loop == 'emulate':
+        emulate_asap(controller, start_time)
+    else:
+        raise ValueError(f'Unknown loop: {loop}')
+    wall = time.perf_counter() - wall
+
+    report: Dict[str, Any] = {
+        'loop': loop,
+        'objects': sum(s.count for s in specs),
+        'duration': duration,
+        'wall_seconds': wall,
+        'throughput': stats.processed / wall if wall > 0 else 0.0,
+        'stats': stats.as_dict(),
+        'max_rss_kb': max_rss_kb(),
+        'rss_growth_kb': max_rss_kb() - rss_before
+    }
+    if loop == 'emulate':
+        report['simulated_per_wall'] = duration / wall if wall > 0 else 0.0
+    if monitor is not None:
+        snapshot = monitor.snapshot()
+        types = list(monitor.types.values())
+        report['process_time'] = _merge([t.process_time for t in types]).snapshot()
+        report['queue_delay'] = _merge([t.queue_delay for t in types]).snapshot()
+        report['timer_lateness'] = _merge([t.timer_lateness for t in types]).snapshot()
+        report['types'] = snapshot['types']
+        report['max_signaled'] = snapshot['queues']['max_signaled']
+    return report
+
+
+def _format(report: Dict[str, Any]) -> str:
+    lines = [
+        f"loop={report['loop']} objects={report['objects']} "
+        f"wall={report['wall_seconds']:.2f}s throughput={report['throughput']:,.0f} process/s",
+        f"stats: {report['stats']}",
+        f"max RSS: {report['max_rss_kb'] / 1024:.1f} MB"
+    ]
+    if 'simulated_per_wall' in report:
+        lines.append(f"simulated seconds per wall second: {report['simulated_per_wall']:,.1f}")
+    for name in ('process_time', 'queue_delay', 'timer_lateness'):
+        if name in report:
+            h = report[name]
+            lines.append(f"{name}: p50={h['p50'] * 1e6:.1f}us p99={h['p99'] * 1e6:.1f}us "
+                         f"p99.9={h['p999'] * 1e6:.1f}us max={h['max'] * 1e6:.1f}us")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='py_active_objects stress harness')
+    parser.add_argument('--loop', choices=['async', 'simple', 'emulate'], default='async')
+    parser.add_argument('--duration', type=float, default=10.0, help='секунды (виртуальные для emulate)')
+    parser.add_argument('--types', type=int, default=3)
+    parser.add_argument('--objects', type=int, default=1000, help='объектов каждого типа')
+    parser.add_argument('--period', type=float, default=1.0, help='период таймера первого типа')
+    parser.add_argument('--fanout', type=int, default=2)
+    parser.add_argument('--work', type=int, default=0, help='итераций работы на вызов')
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--async-rate', type=float, default=0.0)
+    parser.add_argument('--spec', help='JSON-файл со списком описаний типов (TypeSpec)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-metrics', action='store_true')
+    parser.add_argument('--json', help='сохранить отчет в файл')
+    args = parser.parse_args()
+
+    if args.spec:
+        with open(args.spec) as f:
+            specs = [TypeSpec.from_dict(d) for d in json.load(f)]
+    else:
+        specs = default_specs(args.types, args.objects, args.period, args.fanout,
+                              args.work, args.failure_rate, args.async_rate)
+    if args.loop != 'async' and any(s.async_rate for s in specs):
+        parser.error(f'--async-rate/async_rate requires --loop async, not {args.loop}')
+    report = run_stress(specs, args.loop, args.duration, args.seed,
+                        metrics=not args.no_metrics,
+                        priority_count=max(s.priority for s in specs) + 1)
+    print(_format(report))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=1, default=str)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Бенчмарк многопоточного контроллера против однопоточного"""
+import time
+
+from ..active_objects import ActiveObject, ActiveObjectsController
+from ..threaded import ThreadedController, gil_enabled
+from .runner import benchmark, result
+from .controller import START
+
+
+class CpuObject(ActiveObject):
+    """Объект с вычислительной обработкой, передающий сигнал соседу"""
+    type_id = 'cpu'
+
+    def __init__(self, controller, obj_id, work: int, rounds: int):
+        self.work = work
+        self.rounds = rounds
+        self.next: ActiveObject = None
+        super().__init__(controller, obj_id)
+
+    def _process(self):
+        s = 0
+        for i in range(self.work):
+            s += i * i
+        self.rounds -= 1
+        if self.rounds > 0:
+            self.signal()
+            if self.next is not None:
+                self.next.signal()
+
+
+def _run(controller: ActiveObjectsController, n: int, work: int, rounds: int) -> float:
+    controller.emulated_time = START
+    objs = [CpuObject(controller, i, work, rounds) for i in range(n)]
+    for a, b in zip(objs, objs[1:] + objs[:1]):
+        a.next = b
+    t = time.perf_counter()
+    while any(q.count for q in controller.signaled):
+        controller.process()
+    return time.perf_counter() - t
+
+
+@benchmark('threaded.cpu')
+def bench_threaded(quick: bool):
+    res = []
+    n, rounds = (200, 5) if quick else (1000, 20)
+    work = 2000
+    gil = gil_enabled()
+    seconds = _run(ActiveObjectsController(), n, work, rounds)
+    res.append(result('threaded.cpu', n * rounds, seconds, workers=0, gil=gil))
+    for workers in ([2, 4] if quick else [2, 4, 8]):
+        controller = ThreadedController(workers=workers)
+        try:
+            seconds = _run(controller, n, work, rounds)
+            stolen = sum(s['stolen'] for s in controller.get_worker_stats())
+        finally:
+            controller.shutdown()
+        r = result('threaded.cpu', n * rounds, seconds, workers=workers, gil=gil)
+        r['stolen'] = stolen
+        res.append(r)
+    return res
@@ -0,0 +1,162 @@
+"""Синтетическая нагрузка: популяция активных объектов разных типов"""
+import asyncio
+import random
+from datetime import timedelta
+from typing import List, Optional, Dict, Any
+
+from ..active_objects import ActiveObject, ActiveObjectWithRetries, ActiveObjectsController, WAKE_TIMER
+from ..signals import AOListener
+from ..async_tasks import AsyncTaskProcess
+
+
+class WorkloadError(Exception):
+    """Искусственная ошибка обработки"""
+    pass
+
+
+class TypeSpec:
+    """Описание типа объектов нагрузки"""
+
+    def __init__(self, name: str, count: int = 100,
+                 period: Optional[float] = 1.0, jitter: float = 0.1,
+                 fanout: int = 0, work: int = 0,
+                 failure_rate: float = 0.0, retry_interval: float = 0.1,
+                 async_rate: float = 0.0, async_duration: float = 0.01,
+                 priority: int = 0):
+        self.name = name
+        self.count = count  # количество объектов
+        self.period = period  # период таймера, секунды (None - только по сигналам)
+        self.jitter = jitter  # случайное отклонение периода (доля)
+        self.fanout = fanout  # сколько объектов следующего типа сигнализирует
+        self.work = work  # итераций холостой работы на вызов
+        self.failure_rate = failure_rate  # вероятность ошибки вызова
+        self.retry_interval = retry_interval  # начальный интервал повтора
+        self.async_rate = async_rate  # вероятность запуска асинхронной задачи
+        self.async_duration = async_duration  # длительность асинхронной задачи
+        self.priority = priority
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> 'TypeSpec':
+        """Создать из словаря (JSON)"""
+        return cls(**d)
+
+
+class WorkloadObject(ActiveObjectWithRetries):
+    """Объект синтетической нагрузки"""
+
+    def __init__(self, controller: ActiveObjectsController, obj_id,
+                 spec: TypeSpec, stats: 'WorkloadStats', rnd: random.Random):
+        self.type_id = spec.name
+        self.priority = spec.priority
+        self.spec = spec
+        self.stats = stats
+        self.rnd = rnd
+        self.targets: List[ActiveObject] = []
+        self.next_tick = None
+        self.task: Optional[AsyncTaskProcess] = None
+        self.task_listener: Optional[AOListener] = None
+        super().__init__(controller, obj_id)
+        self.min_retry_interval = spec.retry_interval
+        self.max_retry_interval = spec.retry_interval * 16
+
+    def _process(self):
+        spec = self.spec
+        self.stats.processed += 1
+
+        if self.task is not None:
+            if not self.task.is_completed(self.task_listener):
+                return
+            self.stats.async_completed += 1
+            self.task = None
+
+        propagate = spec.period is None and not self.woken_by(WAKE_TIMER)
+        if spec.period is not None and self.reached(self.next_tick):
+            period = spec.period * (1.0 + spec.jitter * (2 * self.rnd.random() - 1))
+            self.next_tick = self.schedule_delay(timedelta(seconds=period))
+            propagate = True
+
+        for _ in range(spec.work):
+            pass
+
+        if spec.failure_rate and self.rnd.random() < spec.failure_rate:
+            raise WorkloadError(spec.name)
+
+        if propagate:
+            for t in self.targets:
+                t.signal()
+            self.stats.signals += len(self.targets)
+            if spec.async_rate and self.rnd.random() < spec.async_rate:
+                self._start_task()
+
+    def _start_task(self):
+        duration = self.spec.async_duration
+
+        async def sleep():
+            await asyncio.sleep(duration)
+            return 0
+
+        self.task = AsyncTaskProcess(self.controller, sleep)
+        if self.task_listener is None:
+            self.task_listener = AOListener(self)
+        self.task.is_completed(self.task_listener)
+        self.stats.async_started += 1
+
+    def _process_internal(self):
+        try:
+            super()._process_internal()
+        except WorkloadError:
+            self.stats.failures += 1
+
+
+class WorkloadStats:
+    """Счетчики нагрузки"""
+
+    def __init__(self):
+        self.processed: int = 0
+        self.signals: int = 0
+        self.failures: int = 0
+        self.async_started: int = 0
+        self.async_completed: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """Представление в виде словаря"""
+        return dict(self.__dict__)
+
+
+class StopObject(ActiveObject):
+    """Завершает работу контроллера в заданное время"""
+
+    def __init__(self, controller: ActiveObjectsController, duration: float):
+        self.stop_at = None
+        self.duration = duration
+        super().__init__(controller)
+
+    def _process(self):
+        if self.stop_at is None:
+            self.stop_at = self.schedule_seconds(self.duration)
+        elif self.reached(self.stop_at):
+            self.controller.terminate()
+
+
+def build_population(controller: ActiveObjectsController, specs: List[TypeSpec],
+                     seed: int = 1, allow_async: bool = True) -> WorkloadStats:
+    """
+    Создать объекты по описаниям типов. Граф сигналов ацикличен: объекты
+    типа i сигнализируют fanout случайных объектов типа i + 1. Без
+    allow_async типы с async_rate недопустимы (ValueError).
+    """
+    if not allow_async:
+        with_async = [spec.name for spec in specs if spec.async_rate]
+        if with_async:
+            raise ValueError(f'async_rate requires async_loop: {", ".join(with_async)}')
+    rnd = random.Random(seed)
+    stats = WorkloadStats()
+    populations = []
+    for spec in specs:
+        populations.append([WorkloadObject(controller, i, spec, stats, rnd)
+                            for i in range(spec.count)])
+    for i in range(len(populations) - 1):
+        nxt = populations[i + 1]
+        for obj in populations[i]:
+            obj.targets = rnd.sample(nxt, min(obj.spec.fanout, len(nxt)))
+    return stats
@@ -2,7 +2,7 @@
 import copy
 from typing import Optional, Set, Any, Dict, List
 
-from .active_objects import ActiveObjectWithRetries, ActiveObjectsController
+from .active_objects import ActiveObjectWithRetries, ActiveObjectsController, WAKE_DB
 
 
 class DbObject(ActiveObjectWithRetries):
@@ -64,9 +64,9 @@ class DbObject(ActiveObjectWithRetries):
             self.db_state = None
             self.changed_fields.clear()
             self.invalidate()
-            self.signal()
+            self.signal(WAKE_DB)
 
-    def set_db_state(self, db_state: Dict):
+    def set_db_state(self, db_state: Dict, reason: int = WAKE_DB):
         """Установить состояние из БД"""
         if self.is_deleted:
             self.invalidate()
@@ -85,7 +85,7 @@ class DbObject(ActiveObjectWithRetries):
             self.db_state = copy.copy(db_state)
             for n in self.changed_fields:
                 self.db_state[n] = old[n]
-        self.signal()
+        self.signal(reason)
 
     @classmethod
     def refresh_db_states(cls, controller: ActiveObjectsController, cur,
@@ -0,0 +1,212 @@
+"""Метрики задержек и пропускной способности контроллера"""
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+from .active_objects import ControllerMonitor, ActiveObject, ActiveObjectsController
+
+
+class LogHistogram:
+    """
+    Гистограмма с логарифмическими корзинами (в стиле HDR): значение
+    хранится с относительной точностью 2 ** -sub_bucket_bits.
+    """
+
+    def __init__(self, unit: float = 1e-6, sub_bucket_bits: int = 4):
+        self.unit = unit  # цена младшего разряда, секунды
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts: List[int] = []
+        self.count: int = 0
+        self.total: float = 0.0
+        self.min: Optional[float] = None
+        self.max: float = 0.0
+
+    def _index(self, v: int) -> int:
+        sb = self.sub_bucket_bits
+        if v < (1 << sb):
+            return v
+        shift = v.bit_length() - sb - 1
+        return ((shift + 1) << sb) + (v >> shift) - (1 << sb)
+
+    def _value(self, index: int) -> float:
+        """Наибольшее значение, попадающее в корзину"""
+        sb = self.sub_bucket_bits
+        if index < (1 << sb):
+            return index * self.unit
+        shift = (index >> sb) - 1
+        mantissa = (index & ((1 << sb) - 1)) + (1 << sb)
+        return (((mantissa + 1) << shift) - 1) * self.unit
+
+    def record(self, value: float):
+        """Учесть значение (секунды)"""
+        if value < 0:
+            value = 0.0
+        i = self._index(int(value / self.unit))
+        counts = self.counts
+        if i >= len(counts):
+            counts.extend([0] * (i + 1 - len(counts)))
+        counts[i] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> float:
+        """Значение процентиля p (0..100)"""
+        if self.count == 0:
+            return 0.0
+        rank = self.count * p / 100.0
+        n = 0
+        for i, c in enumerate(list(self.counts)):
+            n += c
+            if c and n >= rank:
+                return min(self._value(i), self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Сводка по гистограмме"""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'min': self.min or 0.0,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'p999': self.percentile(99.9)
+        }
+
+    def reset(self):
+        """Очистить гистограмму"""
+        self.counts = []
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+
+class TypeMetrics:
+    """Метрики одного типа активных объектов"""
+
+    def __init__(self):
+        self.calls: int = 0
+        self.errors: int = 0
+        self.process_time = LogHistogram()
+        self.queue_delay = LogHistogram()
+        self.timer_lateness = LogHistogram()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Сводка по типу"""
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'process_time': self.process_time.snapshot(),
+            'queue_delay': self.queue_delay.snapshot(),
+            'timer_lateness': self.timer_lateness.snapshot()
+        }
+
+
+class ControllerMetrics(ControllerMonitor):
+    """
+    Метрики контроллера по type_id: количество вызовов _process, их
+    длительность, задержка от сигнала до вызова, опоздание таймеров и
+    глубина очередей. snapshot() можно вызывать из другого потока.
+    """
+
+    needs_signal_time = True
+
+    def __init__(self, depth_sample_interval: int = 64):
+        self.types: Dict[Any, TypeMetrics] = {}
+        self.async_calls: int = 0
+        self.async_time = LogHistogram()
+        self.depth_sample_interval = depth_sample_interval
+        self.max_depths: List[int] = []
+        self.started = time.monotonic()
+        self._countdown: int = 0
+
+    def _type(self, obj: ActiveObject) -> TypeMetrics:
+        type_id = obj.type_id
+        if type_id is None:
+            type_id = obj.__class__.__name__
+        m = self.types.get(type_id)
+        if m is None:
+            m = TypeMetrics()
+            self.types[type_id] = m
+        return m
+
+    def attach(self, controller: ActiveObjectsController):
+        super().attach(controller)
+        self.max_depths = [0] * len(controller.signaled)
+
+    def _sample_depths(self):
+        depths = self.max_depths
+        for i, q in enumerate(self.controller.signaled):
+            if q.count > depths[i]:
+                depths[i] = q.count
+
+    def before_process(self, obj: ActiveObject) -> bool:
+        if obj.signaled_at is not None:
+            self._type(obj).queue_delay.record(
+                (self.controller.now() - obj.signaled_at).total_seconds())
+        self._countdown -= 1
+        if self._countdown <= 0:
+            self._countdown = self.depth_sample_interval
+            self._sample_depths()
+        return False
+
+    def after_process(self, obj: ActiveObject, error: Optional[Exception]):
+        duration = self.controller.process_time
+        m = self._type(obj)
+        m.calls += 1
+        if error is not None:
+            m.errors += 1
+        m.process_time.record(duration)
+
+    def on_timer(self, obj: ActiveObject, t: datetime):
+        self._type(obj).timer_lateness.record(
+            (self.controller.now() - t).total_seconds())
+
+    def on_async_calls(self, count: int, duration: float):
+        self.async_calls += count
+        self.async_time.record(duration)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Снимок метрик"""
+        uptime = time.monotonic() - self.started
+        types = {}
+        for type_id, m in list(self.types.items()):
+            s = m.snapshot()
+            s['throughput'] = m.calls / uptime if uptime > 0 else 0.0
+            types[type_id] = s
+        controller = self.controller
+        res = {
+            'uptime': uptime,
+            'types': types,
+            'async_calls': self.async_calls,
+            'async_time': self.async_time.snapshot(),
+            'queues': {
+                'signaled': [q.count for q in controller.signaled] if controller else [],
+                'max_signaled': list(self.max_depths),
+                'scheduled': controller.tree_by_t.count if controller else 0
+            }
+        }
+        pool = getattr(controller, 'blocking_pool', None)
+        if pool is not None:
+            res['blocking_pool'] = pool.get_stats()
+        cache = getattr(controller, 'task_cache', None)
+        if cache is not None:
+            res['task_cache'] = cache.get_stats()
+        timeouts = getattr(controller, 'task_timeouts', None)
+        if timeouts:
+            res['task_timeouts'] = dict(timeouts)
+        return res
+
+    def reset(self):
+        """Сбросить накопленные метрики"""
+        self.types = {}
+        self.async_calls = 0
+        self.async_time = LogHistogram()
+        self.max_depths = [0] * len(self.max_depths)
+        self.started = time.monotonic()
@@ -0,0 +1,200 @@
+"""Вынос блокирующих _process в пул потоков"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from typing import Optional, Callable, Dict, Any
+
+from .active_objects import (
+    ActiveObject,
+    ActiveObjectsController,
+    WAKE_SIGNAL,
+    _offload_state
+)
+
+
+class BlockingPool:
+    """
+    Пул потоков контроллера для блокирующих вызовов. Результат
+    доставляется в поток контроллера через threadsafe_async_call.
+    """
+
+    def __init__(self, controller: ActiveObjectsController,
+                 max_workers: Optional[int] = None):
+        self.controller = controller
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='ao-blocking')
+        self.max_workers: int = self.executor._max_workers
+        self.submitted: int = 0
+        self.completed: int = 0
+        self.errors: int = 0
+        self.running: int = 0  # выполняются в потоках пула
+        self.max_queue_depth: int = 0  # максимум ожидающих свободного потока
+        self._lock = threading.Lock()
+
+    def queue_depth(self) -> int:
+        """Количество вызовов, ожидающих свободного потока"""
+        with self._lock:
+            return self.submitted - self.completed - self.running
+
+    def submit(self, func: Callable, args: tuple,
+               on_done: Callable[[Optional[BaseException]], None]):
+        """Выполнить func(*args) в пуле, затем on_done(error) в потоке контроллера"""
+        with self._lock:
+            self.submitted += 1
+            depth = self.submitted - self.completed - self.running
+            if depth > self.max_queue_depth:
+                self.max_queue_depth = depth
+        future = self.executor.submit(self._run, func, args)
+        future.add_done_callback(lambda f: self._done(f, on_done))
+
+    def _run(self, func: Callable, args: tuple):
+        with self._lock:
+            self.running += 1
+        try:
+            func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    def _done(self, future: Future, on_done: Callable):
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            with self._lock:
+                self.errors += 1
+        self.controller.threadsafe_async_call(on_done, (error,))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика пула"""
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'running': self.running,
+                'queue_depth': self.submitted - self.completed - self.running,
+                'max_queue_depth': self.max_queue_depth,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'errors': self.errors
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Остановить пул"""
+        self.executor.shutdown(wait)
+
+
+def get_blocking_pool(controller: ActiveObjectsController,
+                      max_workers: Optional[int] = None) -> BlockingPool:
+    """Пул блокирующих вызовов контроллера (создается при первом обращении)"""
+    pool = getattr(controller, 'blocking_pool', None)
+    if pool is None:
+        pool = BlockingPool(controller, max_workers)
+        controller.blocking_pool = pool
+    return pool
+
+
+class OffloadedObject(ActiveObject):
+    """
+    Активный объект, _process которого выполняется в пуле потоков
+    контроллера (см. get_blocking_pool), не останавливая цикл обработки.
+    При offload = False в пул выносится только следующий вызов после
+    offload_next(). Пока _process выполняется в пуле, объект не ставится в
+    очередь: сигналы и таймеры накапливаются и после завершения объект
+    сигнализируется повторно. В эмулированном времени порядок обработки
+    недетерминирован. Вынесенный _process может вызывать signal, schedule,
+    reached и unschedule только для самого объекта (они передаются в поток
+    контроллера); остальные объекты и контроллер - только через
+    controller.threadsafe_async_call (иначе AssertionError).
+    """
+
+    offload: bool = True
+
+    def __init__(self, controller: ActiveObjectsController, obj_id=None):
+        self._offloaded: bool = False  # _process выполняется в пуле
+        self._resignal: bool = False  # сигнализирован во время выполнения
+        self._offload_once: bool = False
+        self.offloaded_at: Optional[datetime] = None
+        super().__init__(controller, obj_id)
+
+    def offload_next(self):
+        """Выполнить следующий _process в пуле потоков"""
+        self._offload_once = True
+
+    def is_offloaded(self) -> bool:
+        """Выполняется ли _process в пуле потоков"""
+        return self._offloaded
+
+    def signal(self, reason: int = WAKE_SIGNAL,
+               deadline: Optional[datetime] = None):
+        """Сигнализировать объект (во время выполнения в пуле - отложенно)"""
+        if _offload_state.offloaded:
+            self.controller.threadsafe_async_call(self.signal, (reason, deadline))
+            return
+        if self._offloaded:
+            self._pending_reasons |= reason
+            self._resignal = True
+            return
+        super().signal(reason, deadline)
+
+    def schedule(self, t: Optional[datetime]):
+        """Запланировать выполнение (из пула - через поток контроллера)"""
+        if _offload_state.offloaded:
+            self.controller.threadsafe_async_call(self.schedule, (t,))
+            return
+        super().schedule(t)
+
+    def unschedule(self):
+        """Отменить запланированное выполнение (из пула - через поток контроллера)"""
+        if _offload_state.offloaded:
+            self.controller.threadsafe_async_call(self.unschedule, ())
+            return
+        super().unschedule()
+
+    def _run_process(self):
+        """
+        Как ActiveObject._run_process, но причины пробуждения вынесенного
+        вызова сбрасывает поток пула
+        """
+        self._take_reasons()
+        try:
+            self._process_internal()
+        finally:
+            if not self._offloaded:
+                self.wake_reasons = 0
+
+    def _process_internal(self):
+        """Выполнить _process в пуле потоков или на месте"""
+        if not (self.offload or self._offload_once):
+            super()._process_internal()
+            return
+        self._offload_once = False
+        self._offloaded = True
+        self.offloaded_at = self.controller.now()
+        get_blocking_pool(self.controller).submit(
+            self._run_blocking, (self.wake_reasons,), self._offload_done)
+
+    def _run_blocking(self, reasons: int):
+        self.wake_reasons = reasons
+        _offload_state.offloaded = True
+        try:
+            super()._process_internal()
+        finally:
+            _offload_state.offloaded = False
+            self.wake_reasons = 0
+
+    def _offload_done(self, error: Optional[BaseException]):
+        """Завершение выполнения в пуле (в потоке контроллера)"""
+        self._offloaded = False
+        self.offloaded_at = None
+        if error is not None:
+            self.on_offload_error(error)
+        if self._resignal:
+            self._resignal = False
+            self.signal(self._pending_reasons or WAKE_SIGNAL)
+
+    def on_offload_error(self, error: BaseException):
+        """Ошибка _process, выполненного в пуле (переопределяется)"""
+        print(f"Offloaded process error: {error}")
+
+    def close(self):
+        """Закрыть объект"""
+        self._resignal = False
+        super().close()
@@ -0,0 +1,183 @@
+"""Потоковый захват вывода системных процессов"""
+import asyncio
+from collections import deque
+from typing import Optional, Callable, List, Tuple, Dict, Any
+
+from .active_objects import ActiveObjectsController, register_wake_reason
+from .signals import Signaler, Listener
+
+WAKE_OUTPUT = register_wake_reason('output')  # у процесса появились новые строки вывода
+
+
+class OutputBuffer:
+    """Кольцевой буфер последних строк с ограничением по числу строк и символам"""
+
+    def __init__(self, max_lines: int = 1000, max_chars: int = 1 << 20):
+        self.max_lines = max_lines
+        self.max_chars = max_chars
+        self.lines: deque = deque()
+        self.chars: int = 0
+        self.total: int = 0  # всего получено строк
+        self.dropped: int = 0  # вытеснено строк
+
+    def add(self, line: str):
+        """Добавить строку, вытеснив самые старые при переполнении"""
+        self.lines.append(line)
+        self.chars += len(line)
+        self.total += 1
+        while len(self.lines) > self.max_lines or (self.chars > self.max_chars and
+                                                   len(self.lines) > 1):
+            self.chars -= len(self.lines.popleft())
+            self.dropped += 1
+
+    def tail(self, n: Optional[int] = None) -> List[str]:
+        """Последние n строк (все - при None)"""
+        if n is None or n >= len(self.lines):
+            return list(self.lines)
+        return list(self.lines)[-n:]
+
+    def text(self) -> str:
+        """Содержимое буфера одной строкой"""
+        return '\n'.join(self.lines)
+
+
+class OutputCapture:
+    """
+    Захват stdout/stderr SystemTaskProcess. Последние строки каждого потока
+    хранятся в кольцевых буферах stdout и stderr. on_lines(name, lines)
+    вызывается в потоке контроллера на каждую прочитанную порцию. При
+    streaming=True строки также накапливаются для take(): слушатели signal
+    пробуждаются (WAKE_OUTPUT) при поступлении строк, а при max_pending
+    невыбранных строк чтение приостанавливается, пока потребитель не
+    заберет их, - процесс блокируется на записи в заполненный канал.
+    Строки длиннее max_line символов обрезаются.
+    """
+
+    def __init__(self, max_lines: int = 1000, max_chars: int = 1 << 20,
+                 max_line: int = 1 << 16, streaming: bool = False,
+                 max_pending: int = 1000,
+                 on_lines: Optional[Callable[[str, List[str]], None]] = None,
+                 capture_stderr: bool = True, encoding: str = 'utf-8',
+                 chunk_size: int = 1 << 16):
+        self.stdout = OutputBuffer(max_lines, max_chars)
+        self.stderr = OutputBuffer(max_lines, max_chars)
+        self.max_line = max_line
+        self.streaming = streaming
+        self.max_pending = max_pending
+        self.on_lines = on_lines
+        self.capture_stderr = capture_stderr
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.signal = Signaler(WAKE_OUTPUT)
+        self.pending: deque = deque()  # (имя потока, строка) для take()
+        self.pauses: int = 0  # приостановок чтения
+        self.truncated: int = 0  # обрезанных строк
+        self.controller: Optional[ActiveObjectsController] = None
+        self._resume: Optional[asyncio.Event] = None
+        self._closed = False
+
+    def attach(self, controller: ActiveObjectsController):
+        """Подготовить захват к чтению"""
+        self.controller = controller
+        self._resume = asyncio.Event()
+        self._resume.set()
+
+    def take(self, max_count: Optional[int] = None,
+             listener: Optional[Listener] = None) -> List[Tuple[str, str]]:
+        """
+        Забрать накопленные строки (имя потока, строка). Если строки
+        остались, listener (или, без него, слушатели signal на следующей
+        итерации цикла) пробуждается снова, иначе listener ждет новых строк
+        """
+        pending = self.pending
+        n = len(pending) if max_count is None else min(max_count, len(pending))
+        res = [pending.popleft() for _ in range(n)]
+        if self._resume is not None and len(pending) < self.max_pending:
+            self._resume.set()
+        if pending:
+            if listener is not None:
+                listener.signal(WAKE_OUTPUT)
+            elif self.controller is not None:
+                # слушатель обычно встает в очередь уже после take()
+                self.controller.threadsafe_async_call(self.signal.signalAll, ())
+        elif listener is not None:
+            listener.wait(self.signal)
+        return res
+
+    def close(self):
+        """Прекратить накопление для take() и возобновить чтение"""
+        self._closed = True
+        self.pending.clear()
+        if self._resume is not None:
+            self._resume.set()
+
+    def _lines(self, name: str, lines: List[str]):
+        buf = self.stdout if name == 'stdout' else self.stderr
+        for line in lines:
+            buf.add(line)
+        if self.on_lines is not None:
+            try:
+                self.on_lines(name, lines)
+            except Exception as e:
+                print(f"Output callback error: {e}")
+        if self.streaming and not self._closed:
+            was_empty = not self.pending
+            self.pending.extend((name, line) for line in lines)
+            if was_empty or self.signal.hasListeners():
+                self.signal.signalAll()
+                self.controller.wakeup()
+            if len(self.pending) >= self.max_pending:
+                self._resume.clear()
+
+    async def _deliver(self, name: str, lines: List[str]):
+        """Передать строки, не превышая max_pending невыбранных"""
+        while lines:
+            if not self._resume.is_set():
+                self.pauses += 1
+                await self._resume.wait()
+            n = len(lines)
+            if self.streaming and not self._closed:
+                n = min(n, self.max_pending - len(self.pending))
+                if n <= 0:
+                    self._resume.clear()
+                    continue
+            self._lines(name, lines[:n])
+            lines = lines[n:]
+
+    def _cut(self, line: bytes) -> str:
+        if len(line) > self.max_line:
+            line = line[:self.max_line]
+            self.truncated += 1
+        return line.decode(self.encoding, 'replace')
+
+    async def read(self, stream: asyncio.StreamReader, name: str):
+        """Читать поток до конца, разбивая на строки"""
+        partial = b''
+        while True:
+            if not self._resume.is_set():
+                self.pauses += 1
+                await self._resume.wait()
+            chunk = await stream.read(self.chunk_size)
+            if not chunk:
+                break
+            parts = chunk.split(b'\n')
+            parts[0] = partial + parts[0]
+            partial = parts.pop()
+            if len(partial) > self.max_line:
+                # хвост длинной строки дальше не нужен - только ее признак
+                partial = partial[:self.max_line + 1]
+            if parts:
+                await self._deliver(name, [self._cut(p.rstrip(b'\r')) for p in parts])
+        if partial:
+            await self._deliver(name, [self._cut(partial.rstrip(b'\r'))])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика захвата"""
+        return {
+            'stdout_lines': self.stdout.total,
+            'stderr_lines': self.stderr.total,
+            'dropped': self.stdout.dropped + self.stderr.dropped,
+            'truncated': self.truncated,
+            'pending': len(self.pending),
+            'pauses': self.pauses
+        }
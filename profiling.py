@@ -0,0 +1,303 @@
+"""Профилирование активных объектов"""
+import cProfile
+import os
+import pstats
+import random
+import weakref
+from typing import Optional, Dict, Any, List, Tuple
+
+from .active_objects import (
+    ControllerMonitor,
+    ActiveObject,
+    WAKE_TIMER,
+    wake_reason_names
+)
+
+TIMER_SOURCE = '<timer>'
+EXTERNAL_SOURCE = '<external>'
+PSEUDO_SOURCES = (TIMER_SOURCE, EXTERNAL_SOURCE)
+
+
+def type_name(obj: ActiveObject):
+    """Имя типа объекта для статистики"""
+    if obj.type_id is not None:
+        return obj.type_id
+    return obj.__class__.__name__
+
+
+class SignalEdge:
+    """Связь 'тип источника сигнала -> тип получателя'"""
+
+    def __init__(self, source, target):
+        self.source = source
+        self.target = target
+        self.count: int = 0  # постановок в очередь
+        self.reasons: int = 0  # использованные причины пробуждения
+        self.processed: int = 0  # вызванных ими _process
+        self.induced_time: float = 0.0  # суммарная длительность этих _process
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Представление в виде словаря"""
+        return {
+            'source': self.source,
+            'target': self.target,
+            'count': self.count,
+            'reasons': wake_reason_names(self.reasons),
+            'processed': self.processed,
+            'induced_time': self.induced_time
+        }
+
+
+class CausalityProfiler(ControllerMonitor):
+    """
+    Строит граф причинности сигналов: какой тип объектов своим _process
+    ставит в очередь объекты какого типа, сколько раз и сколько времени
+    занимает вызванная этим обработка. Учитываются только сигналы,
+    действительно поставившие объект в очередь. Сигналы таймеров и
+    внешнего кода учитываются как источники <timer> и <external>.
+    Причина вызова снимается в before_process, поэтому сигнал объекта
+    самому себе во время _process относится к следующему вызову.
+    """
+
+    needs_signal_hook = True
+
+    def __init__(self):
+        self.edges: Dict[Tuple[Any, Any], SignalEdge] = {}
+        self.processed: Dict[Any, int] = {}  # вызовов _process по типам
+        self._cause: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()  # объект -> связь
+        self._current: Optional[SignalEdge] = None  # причина текущего вызова
+
+    def on_signal(self, source: Optional[ActiveObject], target: ActiveObject,
+                  reason: int):
+        if source is not None:
+            src = type_name(source)
+        elif reason & WAKE_TIMER:
+            src = TIMER_SOURCE
+        else:
+            src = EXTERNAL_SOURCE
+        key = (src, type_name(target))
+        edge = self.edges.get(key)
+        if edge is None:
+            edge = SignalEdge(*key)
+            self.edges[key] = edge
+        edge.count += 1
+        edge.reasons |= reason
+        self._cause[target] = edge
+
+    def before_process(self, obj: ActiveObject) -> bool:
+        self._current = self._cause.pop(obj, None)
+        return False
+
+    def skip_process(self, obj: ActiveObject):
+        if self._current is not None:
+            self._cause.setdefault(obj, self._current)  # вызов не состоялся
+            self._current = None
+
+    def after_process(self, obj: ActiveObject, error: Optional[Exception]):
+        duration = self.controller.process_time
+        t = type_name(obj)
+        self.processed[t] = self.processed.get(t, 0) + 1
+        edge = self._current
+        if edge is not None:
+            self._current = None
+            edge.processed += 1
+            edge.induced_time += duration
+
+    def fan_out(self) -> Dict[Any, float]:
+        """
+        Среднее число постановок в очередь на один вызов _process типа
+        (без <timer> и <external>, см. triggers)
+        """
+        totals: Dict[Any, int] = {}
+        for edge in self.edges.values():
+            if edge.source not in PSEUDO_SOURCES:
+                totals[edge.source] = totals.get(edge.source, 0) + edge.count
+        return {src: n / self.processed[src] if self.processed.get(src) else float(n)
+                for src, n in totals.items()}
+
+    def triggers(self) -> Dict[str, int]:
+        """Число постановок в очередь таймерами и внешним кодом"""
+        totals = {src: 0 for src in PSEUDO_SOURCES}
+        for edge in self.edges.values():
+            if edge.source in PSEUDO_SOURCES:
+                totals[edge.source] += edge.count
+        return totals
+
+    def top_edges(self, n: int = 20, by: str = 'count') -> List[SignalEdge]:
+        """Наиболее нагруженные связи (by: count или induced_time)"""
+        return sorted(self.edges.values(), key=lambda e: getattr(e, by),
+                      reverse=True)[:n]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика в виде словаря"""
+        return {
+            'edges': [e.as_dict() for e in self.top_edges(len(self.edges))],
+            'fan_out': self.fan_out(),
+            'triggers': self.triggers(),
+            'processed': dict(self.processed)
+        }
+
+    def render(self, n: int = 20, by: str = 'count') -> str:
+        """Текстовая таблица наиболее нагруженных связей"""
+        fan_out = self.fan_out()
+        lines = [f"{'source':<24} {'target':<24} {'count':>10} {'fan-out':>8} "
+                 f"{'induced, s':>11}  reasons"]
+        for e in self.top_edges(n, by):
+            ratio = fan_out.get(e.source)
+            ratio = f'{ratio:>8.2f}' if ratio is not None else f"{'-':>8}"
+            lines.append(
+                f"{str(e.source):<24} {str(e.target):<24} {e.count:>10} "
+                f"{ratio} {e.induced_time:>11.6f}  "
+                f"{','.join(wake_reason_names(e.reasons))}")
+        return '\n'.join(lines)
+
+    def to_dot(self, n: int = 50, by: str = 'count') -> str:
+        """Граф наиболее нагруженных связей в формате Graphviz"""
+        lines = ['digraph signals {']
+        for e in self.top_edges(n, by):
+            lines.append(f'  "{e.source}" -> "{e.target}" '
+                         f'[label="{e.count} / {e.induced_time:.3f}s"];')
+        lines.append('}')
+        return '\n'.join(lines)
+
+    def reset(self):
+        """Сбросить накопленную статистику"""
+        self.edges.clear()
+        self.processed.clear()
+        self._cause.clear()
+        self._current = None
+
+
+class SamplingProfiler(ControllerMonitor):
+    """
+    Профилирует cProfile каждый every-й вызов _process (в среднем) и
+    накапливает результаты отдельно по type_id. Результаты выгружаются как
+    pstats или как свернутые стеки (collapsed) для построения flamegraph.
+    Подключается ближе всех к _process (innermost), поэтому хуки других
+    наблюдателей в профиль не попадают.
+    """
+
+    innermost = True
+
+    def __init__(self, every: int = 1000, seed: Optional[int] = None):
+        self.every = every
+        self.profiles: Dict[Any, cProfile.Profile] = {}
+        self.sampled: Dict[Any, int] = {}  # профилированных вызовов по типам
+        self._random = random.Random(seed)
+        self._countdown = self._next_countdown()
+        self._active: Optional[cProfile.Profile] = None
+
+    def _next_countdown(self) -> int:
+        if self.every <= 1:
+            return 1
+        return self._random.randint(1, 2 * self.every - 1)
+
+    def before_process(self, obj: ActiveObject) -> bool:
+        self._countdown -= 1
+        if self._countdown > 0:
+            return False
+        self._countdown = self._next_countdown()
+        t = type_name(obj)
+        prof = self.profiles.get(t)
+        if prof is None:
+            prof = cProfile.Profile()
+            self.profiles[t] = prof
+        self.sampled[t] = self.sampled.get(t, 0) + 1
+        self._active = prof
+        prof.enable()
+        return False
+
+    def after_process(self, obj: ActiveObject, error: Optional[Exception]):
+        prof = self._active
+        if prof is not None:
+            prof.disable()
+            self._active = None
+
+    def skip_process(self, obj: ActiveObject):
+        self.after_process(obj, None)
+
+    def detach(self, controller):
+        if self._active is not None:
+            self._active.disable()
+            self._active = None
+        super().detach(controller)
+
+    def get_stats(self, type_id) -> Optional[pstats.Stats]:
+        """Статистика pstats по типу"""
+        prof = self.profiles.get(type_id)
+        if prof is None:
+            return None
+        return pstats.Stats(prof)
+
+    def dump_stats(self, directory: str) -> List[str]:
+        """Сохранить pstats-файлы по типам (<type_id>.pstats)"""
+        files = []
+        for t, prof in self.profiles.items():
+            path = os.path.join(directory, f'{_safe_name(t)}.pstats')
+            prof.dump_stats(path)
+            files.append(path)
+        return files
+
+    def collapsed(self, type_id) -> Dict[str, int]:
+        """
+        Свернутые стеки типа ('кадр;кадр;...' -> микросекунды собственного
+        времени). cProfile хранит только пары вызывающий-вызываемый, поэтому
+        время вызываемой функции делится между путями пропорционально.
+        """
+        stats = self.get_stats(type_id)
+        if stats is None:
+            return {}
+        return _collapse(stats.stats)
+
+    def write_collapsed(self, path: str, type_id=None):
+        """Записать свернутые стеки (все типы - с именем типа в корне)"""
+        types = list(self.profiles) if type_id is None else [type_id]
+        with open(path, 'w') as f:
+            for t in types:
+                prefix = f'{_safe_name(t)};' if type_id is None else ''
+                for stack, us in self.collapsed(t).items():
+                    f.write(f'{prefix}{stack} {us}\n')
+
+    def reset(self):
+        """Сбросить накопленные профили"""
+        self.profiles.clear()
+        self.sampled.clear()
+
+
+def _safe_name(t) -> str:
+    return ''.join(c if c.isalnum() or c in '-_.' else '_' for c in str(t))
+
+
+def _frame_name(func: tuple) -> str:
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f'{name} ({os.path.basename(filename)}:{line})'
+
+
+def _collapse(st: Dict[tuple, tuple]) -> Dict[str, int]:
+    """Построить свернутые стеки из pstats"""
+    callees: Dict[tuple, Dict[tuple, tuple]] = {}
+    for func, (cc, nc, tt, ct, callers) in st.items():
+        for caller, v in callers.items():
+            callees.setdefault(caller, {})[func] = v
+    out: Dict[str, float] = {}
+
+    def walk(func: tuple, path: str, share: float, seen: set):
+        tt = st[func][2]
+        if tt * share > 0:
+            out[path] = out.get(path, 0.0) + tt * share
+        for callee, v in callees.get(func, {}).items():
+            if callee in seen or callee not in st:
+                continue
+            ct = st[callee][3]
+            if ct <= 0:
+                continue
+            seen.add(callee)
+            walk(callee, path + ';' + _frame_name(callee), share * v[3] / ct, seen)
+            seen.discard(callee)
+
+    for func, v in st.items():
+        if not v[4] and func[0] != __file__:
+            walk(func, _frame_name(func), 1.0, {func})
+    return {k: int(round(v * 1e6)) for k, v in out.items() if v >= 5e-7}
@@ -0,0 +1,94 @@
+"""Параллельный прогон независимых симуляций в нескольких процессах"""
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional, Any, Union, Dict
+
+from .active_objects import ActiveObjectsController
+from .metrics import ControllerMetrics
+from .simulation import Simulation
+
+
+class ScenarioResult:
+    """Результат одного сценария"""
+
+    def __init__(self, index: int, params: Any):
+        self.index = index
+        self.params = params
+        self.result: Any = None
+        self.error: Optional[str] = None  # текст исключения с трассировкой
+        self.wall_seconds: float = 0.0
+        self.virtual_end: Optional[datetime] = None
+        self.steps: int = 0
+        self.metrics: Optional[Dict[str, Any]] = None
+        self.pid: int = 0
+
+    @property
+    def ok(self) -> bool:
+        """Сценарий выполнен без ошибок"""
+        return self.error is None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Представление в виде словаря"""
+        return dict(self.__dict__)
+
+
+def run_scenario(builder: Callable, params: Any, start_time: datetime,
+                 until: Union[datetime, timedelta], index: int = 0,
+                 metrics: bool = False, priority_count: int = 1) -> ScenarioResult:
+    """
+    Выполнить один сценарий в текущем процессе: создать контроллер,
+    вызвать builder(controller, params) и прогнать симуляцию до until.
+    Если builder вернул функцию, ее результат после прогона попадает в
+    ScenarioResult.result, иначе - само возвращенное значение.
+    """
+    res = ScenarioResult(index, params)
+    res.pid = os.getpid()
+    t = time.perf_counter()
+    try:
+        controller = ActiveObjectsController(priority_count)
+        controller.emulated_time = start_time
+        monitor = controller.add_monitor(ControllerMetrics()) if metrics else None
+        sim = Simulation(controller, start_time)
+        collect = builder(controller, params)
+        if isinstance(until, timedelta):
+            until = start_time + until
+        sim.run_until(until)
+        res.virtual_end = sim.now
+        res.steps = sim.steps
+        res.result = collect() if callable(collect) else collect
+        if monitor is not None:
+            res.metrics = monitor.snapshot()
+    except Exception:
+        res.error = traceback.format_exc()
+    res.wall_seconds = time.perf_counter() - t
+    return res
+
+
+def _run_indexed(args: tuple) -> ScenarioResult:
+    return run_scenario(*args)
+
+
+def run_scenarios(builder: Callable, params_list: Iterable[Any],
+                  start_time: datetime, until: Union[datetime, timedelta],
+                  processes: Optional[int] = None, metrics: bool = False,
+                  priority_count: int = 1) -> List[ScenarioResult]:
+    """
+    Выполнить сценарии для каждого набора параметров в пуле процессов
+    (у каждого сценария свой контроллер). builder должен быть функцией
+    верхнего уровня модуля, а параметры и результаты - сериализуемыми
+    pickle. processes=1 выполняет сценарии в текущем процессе.
+    Результаты возвращаются в порядке params_list.
+    """
+    jobs = [(builder, params, start_time, until, i, metrics, priority_count)
+            for i, params in enumerate(params_list)]
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(jobs))
+    if processes <= 1:
+        return [_run_indexed(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        # по одному сценарию на задачу: сценарии обычно длинные и неравные
+        return list(pool.map(_run_indexed, jobs, chunksize=1))
@@ -0,0 +1,311 @@
+"""Шардирование активных объектов по нескольким процессам"""
+import itertools
+import multiprocessing
+import queue
+import threading
+import traceback
+import zlib
+from typing import Callable, Optional, List, Dict, Any
+
+from .active_objects import ActiveObjectsController, ActiveObject, WAKE_SIGNAL
+from .metrics import ControllerMetrics
+
+
+def shard_of(type_id, obj_id, count: int) -> int:
+    """
+    Номер шарда объекта (стабильный между процессами и запусками). Хешируется
+    repr((type_id, obj_id)), поэтому repr идентификаторов должен зависеть
+    только от значения (str, int, кортежи и т.п.), а не от адреса объекта,
+    как object.__repr__ по умолчанию
+    """
+    return zlib.crc32(repr((type_id, obj_id)).encode()) % count
+
+
+class _InboxWakeup:
+    """Пробуждение шарда из других потоков: пустой пакет в его очередь"""
+
+    def __init__(self, inbox: multiprocessing.Queue):
+        self.inbox = inbox
+        self.thread_id: Optional[int] = None  # поток цикла шарда
+        self.pending: bool = False
+
+    def set(self):
+        if threading.get_ident() != self.thread_id and not self.pending:
+            self.pending = True
+            self.inbox.put([])
+
+
+class Shard:
+    """
+    Шард в рабочем процессе: собственный контроллер и доставка сигналов и
+    сообщений объектам других шардов пакетами (один пакет на получателя
+    за итерацию цикла). Доступен объектам как controller.shard.
+    Сообщения передаются объекту вызовом его метода on_message(payload).
+    controller.wakeup() из других потоков (threadsafe_async_call) будит
+    цикл шарда пустым пакетом.
+    """
+
+    def __init__(self, index: int, inboxes: List[multiprocessing.Queue],
+                 replies: multiprocessing.Queue, priority_count: int = 1,
+                 metrics: bool = False):
+        self.index = index
+        self.count = len(inboxes)
+        self.inboxes = inboxes
+        self.replies = replies
+        self.controller = ActiveObjectsController(priority_count)
+        self.controller.shard = self
+        self._wakeup = _InboxWakeup(inboxes[index])
+        self.controller.wakeup_event = self._wakeup
+        self.metrics = self.controller.add_monitor(ControllerMetrics()) if metrics else None
+        self._outgoing: List[list] = [[] for _ in range(self.count)]
+        self.messages_in: int = 0
+        self.messages_out: int = 0
+        self.batches_in: int = 0
+        self.batches_out: int = 0
+        self.undelivered: int = 0
+
+    def owns(self, type_id, obj_id) -> bool:
+        """Принадлежит ли объект этому шарду"""
+        return shard_of(type_id, obj_id, self.count) == self.index
+
+    def signal(self, type_id, obj_id, reason: int = WAKE_SIGNAL):
+        """Сигнализировать объект (возможно, другого шарда)"""
+        self._outgoing[shard_of(type_id, obj_id, self.count)].append(
+            ('signal', type_id, obj_id, reason))
+
+    def send(self, type_id, obj_id, payload: Any):
+        """Отправить сообщение объекту (возможно, другого шарда)"""
+        self._outgoing[shard_of(type_id, obj_id, self.count)].append(
+            ('message', type_id, obj_id, payload))
+
+    def flush(self):
+        """Отправить накопленные пакеты"""
+        for i, batch in enumerate(self._outgoing):
+            if batch:
+                self._outgoing[i] = []
+                self.messages_out += len(batch)
+                if i == self.index:
+                    self.handle(batch)
+                else:
+                    self.batches_out += 1
+                    self.inboxes[i].put(batch)
+
+    def _deliver(self, kind: str, type_id, obj_id, arg):
+        obj = self.controller.find(type_id, obj_id)
+        if obj is None:
+            self.undelivered += 1
+        elif kind == 'signal':
+            obj.signal(arg)
+        else:
+            on_message = getattr(obj, 'on_message', None)
+            if on_message is None:
+                self.undelivered += 1
+            else:
+                on_message(arg)
+
+    def handle(self, batch: list):
+        """Обработать входящий пакет"""
+        if not batch:  # пробуждение
+            self._wakeup.pending = False
+            return
+        self.batches_in += 1
+        for m in batch:
+            kind = m[0]
+            if kind == 'signal' or kind == 'message':
+                self.messages_in += 1
+                self._deliver(*m)
+            elif kind == 'create':
+                _, factory, obj_id, args = m
+                factory(self.controller, obj_id, *args)
+            elif kind == 'query':
+                _, qid, func, args = m
+                try:
+                    self.replies.put((qid, True, func(self, *args)))
+                except Exception:
+                    self.replies.put((qid, False, traceback.format_exc()))
+            elif kind == 'stop':
+                self.controller.terminate()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика шарда"""
+        controller = self.controller
+        res = {
+            'shard': self.index,
+            'objects': controller.tree_by_id.count,
+            'scheduled': controller.tree_by_t.count,
+            'signaled': sum(q.count for q in controller.signaled),
+            'messages_in': self.messages_in,
+            'messages_out': self.messages_out,
+            'batches_in': self.batches_in,
+            'batches_out': self.batches_out,
+            'undelivered': self.undelivered
+        }
+        if self.metrics is not None:
+            res['metrics'] = self.metrics.snapshot()
+        return res
+
+    def run(self):
+        """Цикл обработки шарда"""
+        controller = self.controller
+        inbox = self.inboxes[self.index]
+        self._wakeup.thread_id = threading.get_ident()
+        while not controller.terminated:
+            next_time = controller.process()
+            self.flush()
+            if controller.terminated:
+                break
+            timeout = None
+            if any(q.count for q in controller.signaled) or controller.async_tasks:
+                timeout = 0.0  # локально доставленные сигналы - сразу в process()
+            elif next_time is not None:
+                timeout = max(0.0, (next_time - controller.now()).total_seconds())
+            try:
+                if timeout == 0:
+                    batch = inbox.get_nowait()
+                else:
+                    batch = inbox.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            self.handle(batch)
+            while not controller.terminated:
+                try:
+                    batch = inbox.get_nowait()
+                except queue.Empty:
+                    break
+                self.handle(batch)
+
+
+def _shard_main(index: int, inboxes: list, replies, setup: Optional[Callable],
+                priority_count: int, metrics: bool):
+    shard = Shard(index, inboxes, replies, priority_count, metrics)
+    if setup is not None:
+        setup(shard.controller, shard)
+    shard.run()
+
+
+def _find(shard: Shard, type_id, obj_id) -> Optional[Dict[str, Any]]:
+    obj: ActiveObject = shard.controller.find(type_id, obj_id)
+    if obj is None:
+        return None
+    state = getattr(obj, 'shard_state', None)
+    if state is not None:
+        return state()
+    return {
+        'shard': shard.index,
+        'type_id': obj.type_id,
+        'id': obj.id,
+        'cls': obj.__class__.__name__,
+        'signaled': obj.is_signaled(),
+        't': obj.t
+    }
+
+
+def _call(shard: Shard, func: Callable, args: tuple):
+    return func(shard.controller, *args)
+
+
+class ShardedController:
+    """
+    Развертывание из count рабочих процессов, в каждом свой контроллер.
+    Объекты распределяются по хешу (type_id, id) - см. shard_of. setup(controller, shard)
+    выполняется в каждом процессе при запуске; функции, передаваемые в
+    процессы, должны быть функциями верхнего уровня модуля.
+    """
+
+    def __init__(self, count: int, setup: Optional[Callable] = None,
+                 priority_count: int = 1, metrics: bool = False,
+                 context: Optional[str] = None):
+        self.count = count
+        self.setup = setup
+        self.priority_count = priority_count
+        self.metrics = metrics
+        self._ctx = multiprocessing.get_context(context)
+        self.inboxes: List[multiprocessing.Queue] = []
+        self.replies: Optional[multiprocessing.Queue] = None
+        self.processes: List[multiprocessing.Process] = []
+        self._outgoing: List[list] = [[] for _ in range(count)]
+        self._qids = itertools.count(1)
+        self._pending: Dict[int, tuple] = {}
+
+    def start(self):
+        """Запустить рабочие процессы"""
+        self.inboxes = [self._ctx.Queue() for _ in range(self.count)]
+        self.replies = self._ctx.Queue()
+        for i in range(self.count):
+            p = self._ctx.Process(
+                target=_shard_main, name=f'ao-shard-{i}', daemon=True,
+                args=(i, self.inboxes, self.replies, self.setup,
+                      self.priority_count, self.metrics))
+            p.start()
+            self.processes.append(p)
+
+    def shard_of(self, type_id, obj_id) -> int:
+        """Номер шарда объекта"""
+        return shard_of(type_id, obj_id, self.count)
+
+    def signal(self, type_id, obj_id, reason: int = WAKE_SIGNAL):
+        """Сигнализировать объект (отправляется при flush)"""
+        self._outgoing[self.shard_of(type_id, obj_id)].append(
+            ('signal', type_id, obj_id, reason))
+
+    def send(self, type_id, obj_id, payload: Any):
+        """Отправить сообщение объекту (отправляется при flush)"""
+        self._outgoing[self.shard_of(type_id, obj_id)].append(
+            ('message', type_id, obj_id, payload))
+
+    def create(self, factory: Callable, type_id, obj_id, *args):
+        """Создать объект в его шарде: factory(controller, obj_id, *args)"""
+        self._outgoing[self.shard_of(type_id, obj_id)].append(
+            ('create', factory, obj_id, args))
+
+    def flush(self):
+        """Отправить накопленные пакеты"""
+        for i, batch in enumerate(self._outgoing):
+            if batch:
+                self._outgoing[i] = []
+                self.inboxes[i].put(batch)
+
+    def _query(self, index: int, func: Callable, *args, timeout: Optional[float] = 30.0):
+        self.flush()
+        qid = next(self._qids)
+        self.inboxes[index].put([('query', qid, func, args)])
+        while qid not in self._pending:
+            rid, ok, value = self.replies.get(timeout=timeout)
+            self._pending[rid] = (ok, value)
+        ok, value = self._pending.pop(qid)
+        if not ok:
+            raise Exception(f'Shard {index} query failed:\n{value}')
+        return value
+
+    def find(self, type_id, obj_id) -> Optional[Dict[str, Any]]:
+        """
+        Найти объект в его шарде. Возвращает obj.shard_state(), если метод
+        определен, иначе краткое описание объекта; None - не найден.
+        """
+        return self._query(self.shard_of(type_id, obj_id), _find, type_id, obj_id)
+
+    def call(self, index: int, func: Callable, *args):
+        """Выполнить func(controller, *args) в шарде index и вернуть результат"""
+        return self._query(index, _call, func, args)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Статистика всех шардов"""
+        return [self._query(i, Shard.get_stats) for i in range(self.count)]
+
+    def stop(self, timeout: float = 10.0):
+        """Остановить рабочие процессы"""
+        self.flush()
+        for inbox in self.inboxes:
+            inbox.put([('stop',)])
+        for p in self.processes:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self.processes = []
+
+    def __enter__(self) -> 'ShardedController':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
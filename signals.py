@@ -2,28 +2,35 @@
 from typing import Optional
 
 from .data_structures.linked_list import DualLinkedListItem, DualLinkedList
-from .active_objects import ActiveObject
+from .active_objects import (
+    ActiveObject,
+    WAKE_LISTENER,
+    WAKE_FLAG
+)
 
 
 class Signaler:
     """Источник сигналов"""
 
-    def __init__(self):
+    def __init__(self, reason: int = WAKE_LISTENER):
         self.queue = DualLinkedList()
+        self.reason = reason  # причина пробуждения слушателей
 
-    def signalNext(self) -> bool:
+    def signalNext(self, reason: Optional[int] = None) -> bool:
         """Сигнализировать следующего слушателя"""
         item = self.queue.remove_first()
         if not item:
             return False
-        item.owner.signal()
+        item.owner.signal(self.reason if reason is None else reason)
         return self.queue.first is not None
 
-    def signalAll(self):
+    def signalAll(self, reason: Optional[int] = None):
         """Сигнализировать всех слушателей"""
+        if reason is None:
+            reason = self.reason
         item = self.queue.remove_first()
         while item:
-            item.owner.signal()
+            item.owner.signal(reason)
             item = self.queue.remove_first()
 
     def close(self):
@@ -69,7 +76,7 @@ class Listener:
         """Ожидать сигнала"""
         signaler.check(self)
 
-    def signal(self):
+    def signal(self, reason: int = WAKE_LISTENER):
         """Обработать сигнал"""
         self.queue.remove()
 
@@ -97,10 +104,10 @@ class AOListener(Listener):
         super().__init__()
         self.owner = owner
 
-    def signal(self):
+    def signal(self, reason: int = WAKE_LISTENER):
         """Обработать сигнал и уведомить владельца"""
-        super().signal()
-        self.owner.signal()
+        super().signal(reason)
+        self.owner.signal(reason)
 
 
 class SignalPub:
@@ -110,14 +117,14 @@ class SignalPub:
         self.subscribers = DualLinkedList()
         self.owner = owner
 
-    def signal(self):
+    def signal(self, reason: int = WAKE_LISTENER):
         """Сигнализировать подписчиков"""
         item = self.subscribers.first
         while item:
             sub = item.owner
             if not sub.edge or not sub.is_set:
                 sub.is_set = True
-                sub.owner.signal()
+                sub.owner.signal(reason)
             item = item.next
 
     def close(self):
@@ -127,7 +134,7 @@ class SignalPub:
             sub = item.owner
             if not sub.edge or not sub.is_set:
                 sub.is_set = True
-                sub.owner.signal()
+                sub.owner.signal(WAKE_LISTENER)
             item = self.subscribers.remove_first()
 
 
@@ -182,50 +189,54 @@ class Flag:
         self._wait_down_queue = DualLinkedList()
         self.__is_up = False
 
-    def notify_all(self):
+    def notify_all(self, reason: int = WAKE_FLAG):
         """Уведомить всех ожидающих"""
         if self.__is_up:
             item = self._wait_up_queue.remove_first()
             while item:
-                item.owner.owner.signal()
+                item.owner.owner.signal(reason)
                 item = self._wait_up_queue.remove_first()
         else:
             item = self._wait_down_queue.remove_first()
             while item:
-                item.owner.owner.signal()
+                item.owner.owner.signal(reason)
                 item = self._wait_down_queue.remove_first()
 
-    def notify(self) -> bool:
+    def notify(self, reason: int = WAKE_FLAG) -> bool:
         """Уведомить одного ожидающего"""
         if self.__is_up:
             item = self._wait_up_queue.remove_first()
             if not item:
                 return False
-            item.owner.owner.signal()
+            item.owner.owner.signal(reason)
             return self._wait_up_queue.first is not None
         else:
             item = self._wait_down_queue.remove_first()
             if not item:
                 return False
-            item.owner.owner.signal()
+            item.owner.owner.signal(reason)
             return self._wait_down_queue.first is not None
 
-    def up(self, notify_all: bool = True):
+    def signal(self, reason: int = WAKE_FLAG):
+        """Уведомить всех ожидающих текущего состояния"""
+        self.notify_all(reason)
+
+    def up(self, notify_all: bool = True, reason: int = WAKE_FLAG):
         """Поднять флаг"""
         if self.__is_up:
             return False
         self.__is_up = True
         if notify_all:
-            self.notify_all()
+            self.notify_all(reason)
         return True
 
-    def down(self, notify_all: bool = True):
+    def down(self, notify_all: bool = True, reason: int = WAKE_FLAG):
         """Опустить флаг"""
         if not self.__is_up:
             return False
         self.__is_up = False
         if notify_all:
-            self.notify_all()
+            self.notify_all(reason)
         return True
 
     @property
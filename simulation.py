@@ -0,0 +1,100 @@
+"""Детерминированная симуляция в виртуальном времени"""
+import heapq
+from datetime import datetime, timedelta
+from typing import Optional, Callable, List
+
+from .active_objects import ActiveObjectsController
+
+
+class Simulation:
+    """
+    Драйвер эмулированного времени поверх ActiveObjectsController.
+    В отличие от emulate_asap позволяет остановиться в заданный момент,
+    выполнять шаги и внедрять события в виртуальное время.
+    Порядок детерминирован: в каждый момент сначала выполняются внедренные
+    события (в порядке добавления), затем срабатывают таймеры (при равном
+    времени - в порядке планирования) и обрабатываются очереди контроллера.
+    """
+
+    def __init__(self, controller: ActiveObjectsController, start_time: datetime):
+        self.controller = controller
+        controller.emulated_time = start_time
+        controller.terminated = False
+        self._events: List[tuple] = []
+        self._seq: int = 0
+        self.steps: int = 0  # обработанных моментов времени
+        self.events_fired: int = 0
+
+    @property
+    def now(self) -> datetime:
+        """Текущее виртуальное время"""
+        return self.controller.emulated_time
+
+    def at(self, t: datetime, func: Callable, *args):
+        """Выполнить func(*args) в виртуальный момент t"""
+        self._seq += 1
+        heapq.heappush(self._events, (t, self._seq, func, args))
+
+    def after(self, delay: timedelta, func: Callable, *args):
+        """Выполнить func(*args) через delay виртуального времени"""
+        self.at(self.now + delay, func, *args)
+
+    def _fire_events(self):
+        events = self._events
+        now = self.controller.emulated_time
+        while events and events[0][0] <= now:
+            _, _, func, args = heapq.heappop(events)
+            self.events_fired += 1
+            func(*args)
+
+    def _process_instant(self) -> Optional[datetime]:
+        """Обработать текущий момент, вернуть время следующего"""
+        self._fire_events()
+        next_time = self.controller.process()
+        self.steps += 1
+        if self._events:
+            t = self._events[0][0]
+            if next_time is None or t < next_time:
+                next_time = t
+        return next_time
+
+    def step(self) -> Optional[datetime]:
+        """
+        Обработать текущий момент и перейти к следующему запланированному.
+        Вернуть новое время или None, если планировать больше нечего.
+        """
+        next_time = self._process_instant()
+        if next_time is None or self.controller.terminated:
+            return None
+        if next_time > self.controller.emulated_time:
+            self.controller.emulated_time = next_time
+        return next_time
+
+    def run_until(self, t: datetime) -> bool:
+        """
+        Выполнить симуляцию до момента t включительно и остановиться на нем.
+        Вернуть False, если контроллер был остановлен раньше.
+        """
+        controller = self.controller
+        while not controller.terminated:
+            next_time = self._process_instant()
+            if controller.terminated:
+                break
+            if next_time is None or next_time > t:
+                if t > controller.emulated_time:
+                    controller.emulated_time = t
+                    self._process_instant()
+                return not controller.terminated
+            if next_time > controller.emulated_time:
+                controller.emulated_time = next_time
+        return False
+
+    def run_for(self, delay: timedelta) -> bool:
+        """Выполнить симуляцию на delay виртуального времени вперед"""
+        return self.run_until(self.now + delay)
+
+    def run(self) -> datetime:
+        """Выполнять, пока есть запланированное и контроллер не остановлен"""
+        while self.step() is not None:
+            pass
+        return self.now
@@ -0,0 +1,266 @@
+"""Пул заранее запущенных процессов для выполнения системных команд"""
+import asyncio
+import itertools
+import multiprocessing
+import os
+import signal
+import subprocess
+import threading
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Optional, List, Dict, Any
+
+from .active_objects import ActiveObjectsController
+
+
+def _spawn_worker(conn):
+    """
+    Рабочий процесс: запускает команды по одной и сообщает pid и код
+    завершения. Завершение ожидается через pidfd (Linux), иначе потоком.
+    """
+    send_lock = threading.Lock()
+    proc: Optional[subprocess.Popen] = None
+    job_id: int = 0
+    pidfd: Optional[int] = None
+
+    def send(msg):
+        with send_lock:
+            conn.send(msg)
+
+    def wait_thread(job: int, p: subprocess.Popen):
+        send(('exit', job, p.wait()))
+
+    while True:
+        ready = wait([conn] if pidfd is None else [conn, pidfd])
+        if pidfd is not None and pidfd in ready:
+            os.close(pidfd)
+            pidfd = None
+            send(('exit', job_id, proc.wait()))
+            proc = None
+        if conn not in ready:
+            continue
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        kind = msg[0]
+        if kind == 'run':
+            _, job_id, commands, cwd = msg
+            try:
+                proc = subprocess.Popen(commands, cwd=cwd, stdin=subprocess.DEVNULL,
+                                        stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.DEVNULL)
+            except Exception as e:
+                proc = None
+                send(('error', job_id, e))
+                continue
+            send(('pid', job_id, proc.pid))
+            if hasattr(os, 'pidfd_open'):
+                pidfd = os.pidfd_open(proc.pid)
+            else:
+                threading.Thread(target=wait_thread, args=(job_id, proc),
+                                 daemon=True).start()
+        elif kind == 'signal':
+            _, job, sig = msg
+            if proc is not None and job == job_id:
+                try:
+                    proc.send_signal(sig)
+                except ProcessLookupError:
+                    pass
+        elif kind == 'stop':
+            return
+
+
+class PooledProcess:
+    """Команда, выполняемая пулом (интерфейс как у asyncio.subprocess.Process)"""
+
+    def __init__(self, pool: 'SpawnPool', job_id: int, commands: List[str],
+                 cwd: Optional[str]):
+        self.pool = pool
+        self.job_id = job_id
+        self.commands = commands
+        self.cwd = cwd
+        self.pid: Optional[int] = None
+        self.returncode: Optional[int] = None
+        self.worker: Optional['_Worker'] = None
+        self._pending_signal: Optional[int] = None
+        self._future: asyncio.Future = pool.loop.create_future()
+
+    async def wait(self) -> int:
+        """Дождаться завершения, вернуть код"""
+        return await self._future
+
+    def send_signal(self, sig: int):
+        """Послать сигнал процессу (до запуска - снять команду из очереди)"""
+        if self.returncode is not None:
+            return
+        if self.worker is None:
+            self.pool._dequeue(self)
+            self._set_result(-sig)
+        elif self.pid is None:
+            self._pending_signal = sig
+        else:
+            self.worker.conn.send(('signal', self.job_id, sig))
+
+    def terminate(self):
+        """Завершить процесс (SIGTERM)"""
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        """Убить процесс (SIGKILL)"""
+        self.send_signal(signal.SIGKILL)
+
+    def _set_result(self, code: int):
+        self.returncode = code
+        if not self._future.done():
+            self._future.set_result(code)
+
+    def _set_error(self, error: BaseException):
+        self.returncode = -1
+        if not self._future.done():
+            self._future.set_exception(error)
+
+
+class _Worker:
+    def __init__(self, process: multiprocessing.Process, conn):
+        self.process = process
+        self.conn = conn
+        self.job: Optional[PooledProcess] = None
+
+
+class SpawnPool:
+    """
+    Пул из size долгоживущих рабочих процессов (по умолчанию контекст
+    forkserver), которые запускают команды SystemTaskProcess вместо
+    asyncio.create_subprocess_exec в процессе контроллера. Одновременно
+    выполняется не больше size команд, остальные ждут в очереди FIFO.
+    Устанавливается в controller.spawn_pool; процессы запускаются при
+    первой команде (нужен работающий цикл asyncio). Запуск команд пул не
+    ускоряет (Popen в рабочем процессе плюс обмен сообщениями, см.
+    бенчмарк spawn.commands) - он выносит порождение и ожидание
+    подпроцессов из процесса контроллера.
+    """
+
+    def __init__(self, controller: ActiveObjectsController, size: int = 4,
+                 context: Optional[str] = 'forkserver'):
+        self.controller = controller
+        self.size = size
+        self._ctx = multiprocessing.get_context(context)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.workers: List[_Worker] = []
+        self.queue: deque = deque()
+        self._jobs = itertools.count(1)
+        self.started: int = 0
+        self.completed: int = 0
+        self.max_queued: int = 0
+        self.restarts: int = 0
+        controller.spawn_pool = self
+
+    def start(self):
+        """Запустить рабочие процессы"""
+        if self.loop is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        for _ in range(self.size):
+            self.workers.append(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._ctx.Pipe()
+        p = self._ctx.Process(target=_spawn_worker, args=(child_conn,),
+                              name='ao-spawn', daemon=True)
+        p.start()
+        child_conn.close()
+        worker = _Worker(p, parent_conn)
+        self.loop.add_reader(parent_conn.fileno(), self._on_readable, worker)
+        return worker
+
+    def run(self, commands: List[str], cwd: Optional[str] = None) -> PooledProcess:
+        """Поставить команду в очередь на выполнение"""
+        self.start()
+        proc = PooledProcess(self, next(self._jobs), commands, cwd)
+        self.queue.append(proc)
+        if len(self.queue) > self.max_queued:
+            self.max_queued = len(self.queue)
+        self._dispatch()
+        return proc
+
+    def _dequeue(self, proc: PooledProcess):
+        try:
+            self.queue.remove(proc)
+        except ValueError:
+            pass
+
+    def _dispatch(self):
+        for worker in self.workers:
+            if not self.queue:
+                return
+            if worker.job is None:
+                proc = self.queue.popleft()
+                worker.job = proc
+                proc.worker = worker
+                self.started += 1
+                worker.conn.send(('run', proc.job_id, proc.commands, proc.cwd))
+
+    def _on_readable(self, worker: _Worker):
+        try:
+            while worker.conn.poll():
+                self._handle(worker, worker.conn.recv())
+        except (EOFError, OSError):
+            self._worker_died(worker)
+        self._dispatch()
+
+    def _handle(self, worker: _Worker, msg: tuple):
+        kind, job_id, value = msg
+        proc = worker.job
+        if proc is None or proc.job_id != job_id:
+            return
+        if kind == 'pid':
+            proc.pid = value
+            if proc._pending_signal is not None:
+                worker.conn.send(('signal', job_id, proc._pending_signal))
+            return
+        worker.job = None
+        self.completed += 1
+        if kind == 'exit':
+            proc._set_result(value)
+        else:
+            proc._set_error(value)
+
+    def _worker_died(self, worker: _Worker):
+        self.loop.remove_reader(worker.conn.fileno())
+        worker.conn.close()
+        if worker.job is not None:
+            worker.job._set_error(ChildProcessError('Spawn worker died'))
+            worker.job = None
+        self.restarts += 1
+        self.workers[self.workers.index(worker)] = self._spawn()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика пула"""
+        return {
+            'size': self.size,
+            'running': sum(1 for w in self.workers if w.job is not None),
+            'queued': len(self.queue),
+            'max_queued': self.max_queued,
+            'started': self.started,
+            'completed': self.completed,
+            'restarts': self.restarts
+        }
+
+    def close(self):
+        """Остановить рабочие процессы"""
+        for worker in self.workers:
+            self.loop.remove_reader(worker.conn.fileno())
+            try:
+                worker.conn.send(('stop', 0, None))
+            except OSError:
+                pass
+            worker.conn.close()
+        for worker in self.workers:
+            worker.process.join(5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        self.workers = []
+        self.loop = None
+        if getattr(self.controller, 'spawn_pool', None) is self:
+            self.controller.spawn_pool = None
@@ -0,0 +1,113 @@
+"""Обнаружение зацикливания и лавин сигналов"""
+import time
+from datetime import timedelta
+from typing import Optional, Dict, List, Any
+
+from .active_objects import ControllerMonitor, ActiveObject
+
+
+class StormDetector(ControllerMonitor):
+    """
+    Наблюдатель, считающий частоту вызовов _process по объектам и типам в
+    скользящем окне. Объекты, вызываемые чаще max_count раз за окно,
+    попадают в список нарушителей и, если задан throttle, откладываются
+    в очередь по времени вместо немедленной обработки.
+    """
+
+    def __init__(self, window: float = 1.0, max_count: int = 1000,
+                 max_type_count: Optional[int] = None,
+                 throttle: Optional[timedelta] = None,
+                 max_offenders: int = 100):
+        self.window = window  # длина окна, секунды
+        self.max_count = max_count  # порог вызовов объекта за окно
+        self.max_type_count = max_type_count  # порог вызовов типа за окно
+        self.throttle = throttle  # отсрочка обработки нарушителя
+        self.max_offenders = max_offenders
+        self.throttled_count: int = 0
+        self.offenders: Dict[ActiveObject, Dict[str, Any]] = {}
+        self.type_offenders: Dict[Any, Dict[str, Any]] = {}
+        self._window_start = time.monotonic()
+        self._cur: Dict[ActiveObject, int] = {}
+        self._prev: Dict[ActiveObject, int] = {}
+        self._cur_types: Dict[Any, int] = {}
+        self._prev_types: Dict[Any, int] = {}
+
+    def _rotate(self, now: float):
+        """Сдвинуть окно"""
+        if now - self._window_start >= 2 * self.window:
+            self._prev = {}
+            self._prev_types = {}
+            self._window_start = now
+        else:
+            self._prev = self._cur
+            self._prev_types = self._cur_types
+            self._window_start += self.window
+        self._cur = {}
+        self._cur_types = {}
+
+    def _register(self, offenders: Dict, key, rate: float, now: float, **info):
+        """Учесть нарушителя"""
+        rec = offenders.get(key)
+        if rec is None:
+            if len(offenders) >= self.max_offenders:
+                return
+            rec = dict(info, hits=0, max_rate=0.0, first_seen=now)
+            offenders[key] = rec
+        rec['hits'] += 1
+        rec['rate'] = rate
+        rec['last_seen'] = now
+        if rate > rec['max_rate']:
+            rec['max_rate'] = rate
+
+    def before_process(self, obj: ActiveObject) -> bool:
+        """Учесть вызов и, при необходимости, отложить его"""
+        now = time.monotonic()
+        if now - self._window_start >= self.window:
+            self._rotate(now)
+        k = 1.0 - (now - self._window_start) / self.window
+        rate = self._cur.get(obj, 0) + self._prev.get(obj, 0) * k
+        if rate >= self.max_count:
+            self._register(self.offenders, obj, rate / self.window, now,
+                           type_id=obj.type_id, id=obj.id,
+                           cls=obj.__class__.__name__)
+            if self.throttle is not None:
+                self.throttled_count += 1
+                obj.schedule_delay(self.throttle)
+                return True
+        self._cur[obj] = self._cur.get(obj, 0) + 1
+
+        type_id = obj.type_id
+        if type_id is None:
+            type_id = obj.__class__.__name__
+        n = self._cur_types.get(type_id, 0) + 1
+        self._cur_types[type_id] = n
+        if self.max_type_count is not None:
+            rate = n + self._prev_types.get(type_id, 0) * k
+            if rate >= self.max_type_count:
+                self._register(self.type_offenders, type_id,
+                               rate / self.window, now, type_id=type_id)
+        return False
+
+    def is_offender(self, obj: ActiveObject) -> bool:
+        """Был ли объект замечен в превышении частоты"""
+        return obj in self.offenders
+
+    def get_offenders(self) -> List[Dict[str, Any]]:
+        """Нарушители, по убыванию максимальной частоты (вызовов в секунду)"""
+        return sorted(self.offenders.values(),
+                      key=lambda r: r['max_rate'], reverse=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика обнаружения"""
+        return {
+            'objects': self.get_offenders(),
+            'types': sorted(self.type_offenders.values(),
+                            key=lambda r: r['max_rate'], reverse=True),
+            'throttled': self.throttled_count
+        }
+
+    def reset(self):
+        """Сбросить накопленную статистику"""
+        self.offenders.clear()
+        self.type_offenders.clear()
+        self.throttled_count = 0
@@ -0,0 +1,207 @@
+"""Кэш результатов задач по отпечатку входных данных"""
+import hashlib
+import os
+import pickle
+import re
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, List, Any
+
+from .active_objects import ActiveObjectsController
+from .async_tasks import AbstractTask
+
+_SUFFIX = '.taskcache'
+_FILE_RE = re.compile(r'[0-9a-f]{64}\.taskcache(\.tmp)?')
+
+
+def task_fingerprint(*parts) -> str:
+    """Отпечаток входных данных задачи (части должны сериализоваться pickle)"""
+    return hashlib.sha256(pickle.dumps(parts, protocol=4)).hexdigest()
+
+
+def _digest(key) -> str:
+    if isinstance(key, str):
+        key = key.encode()
+    elif not isinstance(key, bytes):
+        return task_fingerprint(key)
+    return hashlib.sha256(key).hexdigest()
+
+
+class TaskCache:
+    """
+    Кэш результатов задач контроллера (controller.task_cache). Задача с
+    непустым fingerprint() при попадании в кэш сразу завершается с
+    сохраненными exit_code и result; если такая же задача уже выполняется,
+    новая ждет ее результата вместо запуска. Сохраняются только успешные
+    результаты (exit_code = 0): в памяти - последние max_entries (LRU),
+    при заданном path - еще и в файлах <хеш>.taskcache каталога (result
+    через pickle). Записи старше ttl секунд не используются.
+    """
+
+    def __init__(self, controller: ActiveObjectsController, max_entries: int = 1024,
+                 ttl: Optional[float] = None, path: Optional[str] = None):
+        self.controller = controller
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        self.entries: OrderedDict = OrderedDict()  # хеш -> (время, exit_code, result)
+        self.inflight: Dict[str, List[AbstractTask]] = {}  # хеш -> [ведущая, ожидающие...]
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self.deduplicated: int = 0
+        self.stores: int = 0
+        self.evictions: int = 0
+        self.expired: int = 0
+        controller.task_cache = self
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def _file(self, digest: str) -> str:
+        return os.path.join(self.path, digest + _SUFFIX)
+
+    def _get(self, digest: str) -> Optional[tuple]:
+        entry = self.entries.get(digest)
+        if entry is not None:
+            if not self._expired(entry[0]):
+                self.entries.move_to_end(digest)
+                return entry
+            del self.entries[digest]
+            self.expired += 1
+        if self.path is None:
+            return None
+        try:
+            with open(self._file(digest), 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Task cache read error: {e}")
+            return None
+        if self._expired(entry[0]):
+            self.expired += 1
+            self._remove_file(self._file(digest))
+            return None
+        self.disk_hits += 1
+        self._put_memory(digest, entry)
+        return entry
+
+    def _put_memory(self, digest: str, entry: tuple):
+        self.entries[digest] = entry
+        self.entries.move_to_end(digest)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _remove_file(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _store(self, digest: str, task: AbstractTask):
+        entry = (time.time(), task.exit_code, getattr(task, 'result', None))
+        self._put_memory(digest, entry)
+        self.stores += 1
+        if self.path is None:
+            return
+        tmp = self._file(digest) + '.tmp'
+        try:
+            with open(tmp, 'wb') as f:
+                pickle.dump(entry, f, protocol=4)
+            os.replace(tmp, self._file(digest))
+        except Exception as e:
+            print(f"Task cache write error: {e}")
+            self._remove_file(tmp)
+
+    @staticmethod
+    def _finish(task: AbstractTask, exit_code: int, result: Any):
+        task.result = result
+        task.set_exit_code(exit_code)
+        task.completed_signal.signalAll()
+
+    def lookup(self, task: AbstractTask) -> bool:
+        """
+        Найти результат задачи. True - задача завершена из кэша или ждет
+        такую же выполняемую; False - задачу надо запустить (она становится
+        ведущей для своего отпечатка).
+        """
+        digest = _digest(task.fingerprint())
+        task._cache_digest = digest
+        entry = self._get(digest)
+        if entry is not None:
+            self.hits += 1
+            task._cache_state = 'hit'
+            self._finish(task, entry[1], entry[2])
+            return True
+        waiting = self.inflight.get(digest)
+        if waiting is not None:
+            self.deduplicated += 1
+            task._cache_state = 'waiting'
+            waiting.append(task)
+            return True
+        self.misses += 1
+        task._cache_state = 'leader'
+        self.inflight[digest] = [task]
+        return False
+
+    def complete(self, task: AbstractTask):
+        """
+        Ведущая задача завершилась (или закрыта): успешный результат
+        сохраняется и передается ожидающим, иначе ведущей становится первая
+        из ожидающих
+        """
+        digest = task._cache_digest
+        task._cache_state = None
+        waiting = self.inflight.pop(digest, [])[1:]
+        if task.exit_code == 0:
+            self._store(digest, task)
+            for t in waiting:
+                t._cache_state = 'hit'
+                self._finish(t, task.exit_code, getattr(task, 'result', None))
+        elif waiting:
+            leader = waiting[0]
+            leader._cache_state = 'leader'
+            self.inflight[digest] = waiting
+            leader._launch()
+
+    def forget(self, task: AbstractTask):
+        """Убрать ожидающую задачу (отменена или закрыта)"""
+        task._cache_state = None
+        waiting = self.inflight.get(task._cache_digest)
+        if waiting is not None and task in waiting:
+            waiting.remove(task)
+
+    def invalidate(self, key):
+        """Удалить сохраненный результат по отпечатку"""
+        digest = _digest(key)
+        self.entries.pop(digest, None)
+        if self.path is not None:
+            self._remove_file(self._file(digest))
+
+    def clear(self):
+        """Очистить кэш (в памяти и на диске - только файлы кэша)"""
+        self.entries.clear()
+        if self.path is not None:
+            for name in os.listdir(self.path):
+                if _FILE_RE.fullmatch(name):
+                    self._remove_file(os.path.join(self.path, name))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика кэша"""
+        lookups = self.hits + self.deduplicated + self.misses
+        return {
+            'entries': len(self.entries),
+            'inflight': len(self.inflight),
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'deduplicated': self.deduplicated,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'expired': self.expired,
+            'hit_rate': (self.hits + self.deduplicated) / lookups if lookups else 0.0
+        }
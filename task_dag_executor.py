@@ -0,0 +1,247 @@
+"""Выполнение графа зависимых задач (DAG) на основе AbstractTask"""
+import heapq
+import itertools
+from datetime import timedelta
+from typing import Optional, Callable, List, Dict, Any, Iterable, Union
+
+from .active_objects import ActiveObject, ActiveObjectsController
+from .async_tasks import AbstractTask
+from .signals import AOListener
+
+# Состояния узла
+NODE_PENDING = 'pending'  # ждет зависимостей
+NODE_READY = 'ready'  # зависимости выполнены, ждет места
+NODE_RUNNING = 'running'
+NODE_DONE = 'done'
+NODE_FAILED = 'failed'
+NODE_SKIPPED = 'skipped'  # не запускался из-за ошибки зависимости
+NODE_CANCELLED = 'cancelled'
+
+_FINISHED = (NODE_DONE, NODE_FAILED, NODE_SKIPPED, NODE_CANCELLED)
+
+
+class DagTaskNode(ActiveObject):
+    """
+    Узел DAG: когда все зависимости выполнены и есть свободное место,
+    создает задачу factory(node) и ждет ее completed_signal. weight -
+    оценка длительности для приоритета критического пути.
+    """
+
+    def __init__(self, dag: 'TaskDag', name, factory: Callable[['DagTaskNode'], AbstractTask],
+                 deps: Iterable['DagTaskNode'] = (), weight: float = 1.0):
+        self.dag = dag
+        self.name = name
+        self.factory = factory
+        self.deps: List[DagTaskNode] = list(deps)
+        self.dependents: List[DagTaskNode] = []
+        self.weight = weight
+        self.rank: float = weight  # длина пути до конца графа с учетом weight
+        self.state: str = NODE_PENDING
+        self.remaining: int = len(self.deps)  # невыполненных зависимостей
+        self.task: Optional[AbstractTask] = None
+        self.error: Optional[Exception] = None
+        self.listener = AOListener(self)
+        for d in self.deps:
+            d.dependents.append(self)
+        super().__init__(dag.controller)
+
+    def is_finished(self) -> bool:
+        """Узел завершен (успешно или нет)"""
+        return self.state in _FINISHED
+
+    def _start(self):
+        self.state = NODE_RUNNING
+        try:
+            self.task = self.factory(self)
+        except Exception as e:
+            self.error = e
+            self.state = NODE_FAILED
+            self.dag._node_finished(self)
+            return
+        self.dag.add_child(self.task)
+        self.signal()
+
+    def _process(self):
+        if self.state != NODE_RUNNING or self.task is None:
+            return
+        if not self.task.is_completed(self.listener):
+            return
+        if self.task.exit_code == 0:
+            self.state = NODE_DONE
+        elif self.dag._cancelled:
+            self.state = NODE_CANCELLED
+        else:
+            self.error = self.task.error
+            self.state = NODE_FAILED
+        self.dag._node_finished(self)
+
+    def close(self):
+        """Закрыть узел"""
+        self.listener.close()
+        super().close()
+
+
+class TaskDag(AbstractTask):
+    """
+    Исполнитель DAG задач, сам являющийся задачей: exit_code = 0, если все
+    узлы выполнены успешно, иначе -1. Готовые узлы запускаются не более
+    max_concurrency одновременно, первыми - с наибольшей длиной
+    оставшегося критического пути. Ошибка узла пропускает все зависящие
+    от него узлы, а при fail_fast отменяет и весь граф. Дедлайн графа
+    (timeout) передается задачам узлов.
+    """
+
+    def __init__(self, controller: ActiveObjectsController,
+                 max_concurrency: Optional[int] = None, fail_fast: bool = False,
+                 timeout: Union[float, timedelta, None] = None):
+        self.nodes: List[DagTaskNode] = []
+        self.by_name: Dict[Any, DagTaskNode] = {}
+        self.max_concurrency = max_concurrency
+        self.fail_fast = fail_fast
+        self.running: int = 0
+        self.max_running: int = 0
+        self.finished: int = 0
+        self.failed: int = 0
+        self._ready: list = []  # куча (-rank, номер, узел)
+        self._seq = itertools.count()
+        self._started = False
+        self._cancelled = False
+        self._dispatching = False
+        super().__init__(controller, timeout=timeout)
+
+    def add(self, name, factory: Callable[[DagTaskNode], AbstractTask],
+            deps: Iterable = (), weight: float = 1.0) -> DagTaskNode:
+        """Добавить узел (deps - узлы или их имена)"""
+        if self._started:
+            raise Exception('DAG already started')
+        if name in self.by_name:
+            raise ValueError(f'Duplicate DAG node: {name!r}')
+        deps = [d if isinstance(d, DagTaskNode) else self.by_name[d] for d in deps]
+        node = DagTaskNode(self, name, factory, deps, weight)
+        self.nodes.append(node)
+        self.by_name[name] = node
+        return node
+
+    def _compute_ranks(self):
+        """Длины критических путей (обратный топологический порядок)"""
+        pending = {n: len(n.dependents) for n in self.nodes}
+        stack = [n for n, c in pending.items() if c == 0]
+        visited = 0
+        while stack:
+            n = stack.pop()
+            visited += 1
+            n.rank = n.weight + max((d.rank for d in n.dependents), default=0.0)
+            for d in n.deps:
+                pending[d] -= 1
+                if pending[d] == 0:
+                    stack.append(d)
+        if visited != len(self.nodes):
+            raise ValueError('DAG contains a cycle')
+
+    def start(self):
+        """Запустить выполнение графа"""
+        if self._started:
+            return
+        self._compute_ranks()
+        self._started = True
+        for n in self.nodes:
+            if n.remaining == 0:
+                self._push_ready(n)
+        self._dispatch()
+        self._check_completed()
+
+    def critical_path(self) -> List[DagTaskNode]:
+        """Критический путь графа (по weight)"""
+        path = []
+        candidates = [n for n in self.nodes if not n.deps]
+        while candidates:
+            n = max(candidates, key=lambda x: x.rank)
+            path.append(n)
+            candidates = n.dependents
+        return path
+
+    def _push_ready(self, node: DagTaskNode):
+        node.state = NODE_READY
+        heapq.heappush(self._ready, (-node.rank, next(self._seq), node))
+
+    def _dispatch(self):
+        if self._dispatching:
+            return  # узел завершился сразу в _start - его место займет цикл ниже
+        self._dispatching = True
+        try:
+            while self._ready and (self.max_concurrency is None or
+                                   self.running < self.max_concurrency):
+                _, _, node = heapq.heappop(self._ready)
+                if node.state != NODE_READY:
+                    continue
+                self.running += 1
+                if self.running > self.max_running:
+                    self.max_running = self.running
+                node._start()
+        finally:
+            self._dispatching = False
+
+    def _node_finished(self, node: DagTaskNode):
+        self.running -= 1
+        self.finished += 1
+        if node.state == NODE_DONE:
+            for d in node.dependents:
+                d.remaining -= 1
+                if d.remaining == 0 and d.state == NODE_PENDING:
+                    self._push_ready(d)
+        elif node.state == NODE_FAILED:
+            self.failed += 1
+            self._skip_dependents(node)
+            if self.fail_fast:
+                self.cancel()
+        self._dispatch()
+        self._check_completed()
+
+    def _skip_dependents(self, node: DagTaskNode):
+        """Пропустить все узлы, транзитивно зависящие от node"""
+        stack = list(node.dependents)
+        while stack:
+            d = stack.pop()
+            if d.state in (NODE_PENDING, NODE_READY):
+                d.state = NODE_SKIPPED
+                self.finished += 1
+                stack.extend(d.dependents)
+
+    def _check_completed(self):
+        if self.exit_code is None and self.finished == len(self.nodes):
+            ok = all(n.state == NODE_DONE for n in self.nodes)
+            self.set_exit_code(0 if ok else -1)
+            self.completed_signal.signalAll()
+
+    def cancel(self, kill: bool = False):
+        """Отменить граф: ожидающие узлы отменяются, выполняемые задачи - тоже"""
+        super().cancel(kill)
+        self._cancelled = True
+        for n in self.nodes:
+            if n.state in (NODE_PENDING, NODE_READY):
+                n.state = NODE_CANCELLED
+                self.finished += 1
+            elif n.state == NODE_RUNNING and n.task is not None:
+                n.task.cancel(kill)
+        self._ready = []
+        self._check_completed()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика выполнения"""
+        states: Dict[str, int] = {}
+        for n in self.nodes:
+            states[n.state] = states.get(n.state, 0) + 1
+        return {
+            'nodes': len(self.nodes),
+            'states': states,
+            'running': self.running,
+            'max_running': self.max_running,
+            'ready': sum(1 for e in self._ready if e[2].state == NODE_READY),
+            'critical_path': max((n.rank for n in self.nodes if not n.deps), default=0.0)
+        }
+
+    def close(self):
+        """Закрыть граф и его узлы"""
+        for n in self.nodes:
+            n.close()
+        super().close()
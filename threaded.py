@@ -0,0 +1,273 @@
+"""Многопоточная обработка активных объектов (для сборок Python без GIL)"""
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Optional, Callable, List, Any
+
+from .active_objects import ActiveObjectsController, ActiveObject, _comp_t, _comp_id
+from .data_structures.avl_tree import Tree, TreeNode
+from .data_structures.linked_list import DualLinkedList, DualLinkedListItem
+
+
+def gil_enabled() -> bool:
+    """Включен ли GIL в текущем интерпретаторе"""
+    is_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_enabled is None else is_enabled()
+
+
+class LockedDualLinkedList(DualLinkedList):
+    """Двусвязный список, изменяемый под общей блокировкой"""
+
+    def __init__(self, lock: threading.RLock):
+        super().__init__()
+        self.lock = lock
+
+    def add(self, item: DualLinkedListItem):
+        with self.lock:
+            super().add(item)
+
+    def add_first(self, item: DualLinkedListItem):
+        with self.lock:
+            super().add_first(item)
+
+    def remove(self, item: DualLinkedListItem):
+        with self.lock:
+            super().remove(item)
+
+    def remove_first(self) -> Optional[DualLinkedListItem]:
+        with self.lock:
+            return super().remove_first()
+
+
+class LockedTree(Tree):
+    """AVL дерево, изменяемое под общей блокировкой"""
+
+    def __init__(self, comp: Callable, lock: threading.RLock):
+        super().__init__(comp)
+        self.lock = lock
+
+    def add(self, node: TreeNode, Comp: Callable = None):
+        with self.lock:
+            super().add(node, Comp)
+
+    def remove(self, node: TreeNode):
+        with self.lock:
+            super().remove(node)
+
+    def find(self, Data: Any, Comp: Callable = None) -> Optional[TreeNode]:
+        with self.lock:
+            return super().find(Data, Comp)
+
+
+class WorkerPool:
+    """
+    Пул потоков с собственной очередью у каждого потока. Поток берет работу
+    из начала своей очереди, а при ее отсутствии крадет с конца чужой.
+    """
+
+    def __init__(self, run: Callable[[ActiveObject], None], workers: int):
+        self.run = run
+        self.queues: List[deque] = [deque() for _ in range(workers)]
+        self.cond = threading.Condition()
+        self.inflight: int = 0  # переданных потокам и еще не обработанных
+        self.stopped = False
+        self.processed: List[int] = [0] * workers
+        self.stolen: List[int] = [0] * workers
+        self._next: int = 0
+        self.threads = [threading.Thread(target=self._work, args=(i,),
+                                         name=f'ao-worker-{i}', daemon=True)
+                        for i in range(workers)]
+        for t in self.threads:
+            t.start()
+
+    def submit(self, objs: List[ActiveObject]):
+        """Распределить объекты по очередям потоков"""
+        n = len(self.queues)
+        with self.cond:
+            for obj in objs:
+                self.queues[self._next].append(obj)
+                self._next = (self._next + 1) % n
+            self.inflight += len(objs)
+            self.cond.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        """Дождаться завершения хотя бы одной задачи, вернуть inflight"""
+        with self.cond:
+            if self.inflight > 0:
+                self.cond.wait(timeout)
+            return self.inflight
+
+    def wait_all(self):
+        """Дождаться завершения всех переданных задач"""
+        with self.cond:
+            while self.inflight > 0:
+                self.cond.wait()
+
+    def _take(self, index: int) -> Optional[ActiveObject]:
+        try:
+            return self.queues[index].popleft()
+        except IndexError:
+            pass
+        n = len(self.queues)
+        for j in range(1, n):
+            try:
+                obj = self.queues[(index + j) % n].pop()
+            except IndexError:
+                continue
+            self.stolen[index] += 1
+            return obj
+        return None
+
+    def _work(self, index: int):
+        while True:
+            obj = self._take(index)
+            if obj is None:
+                with self.cond:
+                    while not self.stopped and not any(self.queues):
+                        self.cond.wait()
+                    if self.stopped:
+                        return
+                continue
+            try:
+                self.run(obj)
+            finally:
+                self.processed[index] += 1
+                with self.cond:
+                    self.inflight -= 1
+                    self.cond.notify_all()
+
+    def shutdown(self):
+        """Остановить потоки"""
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        for t in self.threads:
+            t.join()
+
+
+class ThreadedController(ActiveObjectsController):
+    """
+    Контроллер, обрабатывающий сигнализированные объекты в workers потоках.
+    Один объект никогда не обрабатывается одновременно в двух потоках: если
+    он сигнализирован во время обработки, то будет обработан повторно после
+    ее завершения. Очереди, дерево таймеров и индекс объектов изменяются под
+    общей блокировкой lock, под ней же доставляются сигналы (signal_lock).
+    Примитивы signals.py (Signaler, Flag, AOListener и т.п.) не
+    потокобезопасны и не должны использоваться совместно объектами,
+    обрабатываемыми в разных потоках. Выигрыш возможен только на сборках
+    без GIL (python3.13t+); наблюдатели (ControllerMonitor) в этом режиме
+    не вызываются, EDF-очереди не поддерживаются.
+    """
+
+    def __init__(self, priority_count: int = 1, workers: int = 4):
+        self.lock = threading.RLock()
+        super().__init__(priority_count)
+        self.tree_by_t = LockedTree(_comp_t, self.lock)
+        self.tree_by_id = LockedTree(_comp_id, self.lock)
+        self.signaled = [LockedDualLinkedList(self.lock) for _ in range(priority_count)]
+        self.signal_lock = self.lock
+        self.workers = workers
+        self.pool: Optional[WorkerPool] = None
+        self._running: set = set()  # обрабатываемые сейчас объекты
+        self._rerun: set = set()  # сигнализированные во время обработки
+        self._error: Optional[BaseException] = None
+
+    def _take_signaled(self, limit: int) -> List[ActiveObject]:
+        """Извлечь до limit сигнализированных объектов, не обрабатываемых сейчас"""
+        res = []
+        with self.lock:
+            for queue in self.signaled:
+                while len(res) < limit:
+                    item = queue.remove_first()
+                    if item is None:
+                        break
+                    obj = item.owner
+                    if obj in self._running:
+                        self._rerun.add(obj)
+                    else:
+                        self._running.add(obj)
+                        res.append(obj)
+        return res
+
+    def _finished(self, obj: ActiveObject):
+        with self.lock:
+            self._running.discard(obj)
+            if obj in self._rerun:
+                self._rerun.discard(obj)
+                if not obj.signaled.in_list():
+                    self.signaled[obj.priority].add(obj.signaled)
+
+    def process(self, max_count: int = None,
+                on_before: Callable = None,
+                on_success: Callable = None,
+                on_error: Callable = None) -> Optional[datetime]:
+        """Обработать очередную порцию объектов в пуле потоков"""
+
+        def do(obj: ActiveObject):
+            try:
+                obj.unschedule()
+                if on_before and on_before(obj):
+                    return
+                if on_error is None:
+                    obj._run_process()
+                    if on_success:
+                        on_success(obj)
+                else:
+                    try:
+                        obj._run_process()
+                        if on_success:
+                            on_success(obj)
+                    except Exception as e:
+                        on_error(obj, e)
+            except BaseException as e:
+                if self._error is None:
+                    self._error = e
+            finally:
+                self._finished(obj)
+
+        if self.pool is None:
+            self.pool = WorkerPool(None, self.workers)
+        pool = self.pool
+        pool.run = do
+        batch_size = 4 * self.workers
+        count = 0
+
+        while not self.terminated:
+            if self.async_tasks:
+                self._run_async_calls([])
+            with self.lock:
+                next_time = self._fire_timers([])
+            if self._error is not None:
+                pool.wait_all()
+                error, self._error = self._error, None
+                raise error
+            batch = self._take_signaled(batch_size)
+            if batch:
+                pool.submit(batch)
+                count += len(batch)
+                if max_count and count >= max_count:
+                    pool.wait_all()
+                    return self.now()
+                continue
+            if pool.inflight == 0 and not self._rerun:
+                return next_time
+            timeout = None
+            if next_time is not None:
+                timeout = max(0.0, (next_time - self.now()).total_seconds())
+            pool.wait(timeout)
+        pool.wait_all()
+        return None
+
+    def shutdown(self):
+        """Остановить потоки пула"""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def get_worker_stats(self) -> List[dict]:
+        """Статистика потоков: обработано объектов, украдено из чужих очередей"""
+        if self.pool is None:
+            return []
+        return [{'worker': i, 'processed': p, 'stolen': s}
+                for i, (p, s) in enumerate(zip(self.pool.processed, self.pool.stolen))]
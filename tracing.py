@@ -0,0 +1,127 @@
+"""Трассировка работы контроллера в формате Chrome trace (Perfetto)"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+from .active_objects import ControllerMonitor, ActiveObject, wake_reason_names
+
+
+def _obj_name(obj: ActiveObject) -> str:
+    if obj.type_id is not None:
+        return str(obj.type_id)
+    return obj.__class__.__name__
+
+
+class ControllerTracer(ControllerMonitor):
+    """
+    Записывает вызовы _process, срабатывания таймеров, выполнение
+    threadsafe_async_call и завершение асинхронных задач в кольцевой буфер.
+    Буфер сохраняется в JSON формата Chrome trace (chrome://tracing,
+    ui.perfetto.dev) по запросу либо автоматически, когда вызов _process
+    дольше latency_threshold секунд.
+    """
+
+    def __init__(self, capacity: int = 100000,
+                 latency_threshold: Optional[float] = None,
+                 dump_path: str = 'trace_{n}.json',
+                 dump_interval: float = 60.0):
+        self.events: deque = deque(maxlen=capacity)
+        self.enabled: bool = True
+        self.latency_threshold = latency_threshold
+        self.dump_path = dump_path  # шаблон имени файла, {n} - номер дампа
+        self.dump_interval = dump_interval  # минимальный интервал автосохранения
+        self.dump_count: int = 0
+        self.dumped: List[str] = []
+        self._last_dump: Optional[float] = None
+        self._reasons: int = 0
+        self._pid = os.getpid()
+        self._tid = threading.get_ident()
+
+    def before_process(self, obj: ActiveObject) -> bool:
+        self._reasons = obj._pending_reasons
+        return False
+
+    def after_process(self, obj: ActiveObject, error: Optional[Exception]):
+        if not self.enabled:
+            return
+        start = self.controller.process_start
+        duration = self.controller.process_time
+        end = start + duration
+        self.events.append(('X', _obj_name(obj), start, duration,
+                            (obj.id, self._reasons, error)))
+        if self.latency_threshold is not None and duration >= self.latency_threshold:
+            if self._last_dump is None or end - self._last_dump >= self.dump_interval:
+                self._last_dump = end
+                self.dump()
+
+    def on_timer(self, obj: ActiveObject, t: datetime):
+        if self.enabled:
+            lateness = (self.controller.now() - t).total_seconds()
+            self.events.append(('i', 'timer ' + _obj_name(obj), time.perf_counter(),
+                                0.0, (obj.id, lateness)))
+
+    def on_async_calls(self, count: int, duration: float):
+        if self.enabled:
+            self.events.append(('X', 'async_calls', time.perf_counter() - duration,
+                                duration, count))
+
+    def on_task_completed(self, task: ActiveObject, duration: float):
+        if self.enabled:
+            self.events.append(('T', task.__class__.__name__,
+                                time.perf_counter() - duration, duration,
+                                (id(task), task.exit_code)))
+
+    def _to_chrome(self, e: tuple) -> List[Dict[str, Any]]:
+        ph, name, ts, dur, args = e
+        res = {'name': name, 'ts': ts * 1e6, 'pid': self._pid, 'tid': self._tid}
+        if ph == 'T':
+            # асинхронные задачи пересекаются во времени - парные async-события
+            res['cat'] = 'task'
+            res['id'] = args[0]
+            end = dict(res, ph='e', ts=(ts + dur) * 1e6,
+                       args={'exit_code': args[1]})
+            res['ph'] = 'b'
+            return [res, end]
+        if ph == 'X':
+            res['ph'] = 'X'
+            res['dur'] = dur * 1e6
+            if name == 'async_calls':
+                res['cat'] = 'async_calls'
+                res['args'] = {'count': args}
+            else:
+                obj_id, reasons, error = args
+                res['cat'] = 'process'
+                res['args'] = {'id': repr(obj_id), 'reasons': wake_reason_names(reasons)}
+                if error is not None:
+                    res['args']['error'] = repr(error)
+        elif ph == 'i':
+            res['ph'] = 'i'
+            res['s'] = 't'
+            res['cat'] = 'timer'
+            res['args'] = {'id': repr(args[0]), 'lateness': args[1]}
+        return [res]
+
+    def get_trace(self) -> Dict[str, Any]:
+        """Содержимое буфера в формате Chrome trace"""
+        events = []
+        for e in list(self.events):
+            events.extend(self._to_chrome(e))
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, path: Optional[str] = None) -> str:
+        """Сохранить буфер в файл, вернуть имя файла"""
+        self.dump_count += 1
+        if path is None:
+            path = self.dump_path.format(n=self.dump_count)
+        with open(path, 'w') as f:
+            json.dump(self.get_trace(), f)
+        self.dumped.append(path)
+        return path
+
+    def clear(self):
+        """Очистить буфер"""
+        self.events.clear()
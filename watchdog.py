@@ -0,0 +1,138 @@
+"""Сторожевой поток, обнаруживающий долгие вызовы _process"""
+import sys
+import threading
+import time
+import traceback
+from collections import deque, Counter
+from typing import Optional, Callable, Dict, Any, List
+
+from .active_objects import ControllerMonitor, ActiveObject, ActiveObjectsController
+
+
+class ProcessWatchdog(ControllerMonitor):
+    """
+    Сторожевой поток: если текущий вызов _process длится дольше threshold
+    секунд, несколько раз снимает стек потока контроллера через
+    sys._current_frames() и сохраняет отчет с типом и ID объекта.
+    """
+
+    def __init__(self, threshold: float = 0.5, samples: int = 5,
+                 sample_interval: float = 0.05,
+                 on_report: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 max_reports: int = 100):
+        self.threshold = threshold  # порог длительности, секунды
+        self.samples = samples  # количество снимков стека
+        self.sample_interval = sample_interval  # интервал между снимками
+        self.on_report = on_report
+        self.reports: deque = deque(maxlen=max_reports)
+        self.check_interval = min(threshold / 4, 0.1)
+        self._state: Optional[tuple] = None  # (номер вызова, объект, начало, поток)
+        self._seq: int = 0
+        self._report: Optional[Dict[str, Any]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def attach(self, controller: ActiveObjectsController):
+        super().attach(controller)
+        self.start()
+
+    def detach(self, controller: ActiveObjectsController):
+        self.stop()
+        super().detach(controller)
+
+    def start(self):
+        """Запустить сторожевой поток"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='ao-watchdog',
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Остановить сторожевой поток"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def before_process(self, obj: ActiveObject) -> bool:
+        self._seq += 1
+        self._state = (self._seq, obj, time.monotonic(), threading.get_ident())
+        return False
+
+    def after_process(self, obj: ActiveObject, error: Optional[Exception]):
+        state = self._state
+        self._state = None
+        report = self._report
+        if report is not None and state is not None and report['seq'] == state[0]:
+            report['duration'] = time.monotonic() - state[2]
+            report['completed'] = True
+
+    def skip_process(self, obj: ActiveObject):
+        self._state = None
+
+    def _sample(self, tid: int) -> Optional[List[str]]:
+        frame = sys._current_frames().get(tid)
+        if frame is None:
+            return None
+        return traceback.format_stack(frame)
+
+    def _check(self):
+        state = self._state
+        if state is None:
+            return
+        seq, obj, started, tid = state
+        if time.monotonic() - started < self.threshold:
+            return
+        if self._report is not None and self._report['seq'] == seq:
+            return
+        report = {
+            'seq': seq,
+            'type_id': obj.type_id,
+            'id': obj.id,
+            'cls': obj.__class__.__name__,
+            'started': started,
+            'duration': time.monotonic() - started,
+            'completed': False,
+            'stacks': []
+        }
+        self._report = report
+        for i in range(self.samples):
+            if i > 0 and self._stop.wait(self.sample_interval):
+                break
+            cur = self._state
+            if cur is None or cur[0] != seq:
+                break
+            stack = self._sample(tid)
+            if stack is not None:
+                report['stacks'].append(stack)
+        if not report['completed']:
+            report['duration'] = time.monotonic() - started
+        self.reports.append(report)
+        if self.on_report is not None:
+            try:
+                self.on_report(report)
+            except Exception as e:
+                print(f"Watchdog report error: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            self._check()
+
+    @staticmethod
+    def hot_frames(report: Dict[str, Any], n: int = 5) -> List[tuple]:
+        """Самые частые кадры стека в отчете (кадр, количество снимков)"""
+        c = Counter()
+        for stack in report['stacks']:
+            c.update(set(stack))
+        return c.most_common(n)
+
+    @staticmethod
+    def format_report(report: Dict[str, Any]) -> str:
+        """Текстовое представление отчета"""
+        lines = [f"Slow _process: {report['cls']} {report['type_id']}{repr(report['id'])} "
+                 f"{report['duration']:.3f}s"
+                 f"{'' if report['completed'] else ' (running)'}"]
+        if report['stacks']:
+            lines.append(''.join(report['stacks'][-1]).rstrip())
+        return '\n'.join(lines)